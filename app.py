@@ -1,22 +1,35 @@
 import dash
 import dash_bootstrap_components as dbc
-from dash import Dash, html, dcc, callback
+from dash import Dash, html, dcc, callback, clientside_callback, ClientsideFunction
 from dash.dependencies import Input, Output, State
 from comp import nav, body, offcanvas, modal
 from utils.helpers import * # see helpers for details
+from utils.cache import init_cache
+from dash import DiskcacheManager
+import diskcache
+import os
 
 # Globals -----------------------------------------------------------
+# Background callbacks (long Corva pulls) run as jobs in separate processes,
+# queued through a local disk cache so request workers stay free
+CALLBACK_CACHE_DIR = os.getenv('CALLBACK_CACHE_DIR', os.path.join('data', 'callback_cache'))
+background_callback_manager = DiskcacheManager(diskcache.Cache(CALLBACK_CACHE_DIR))
 
 # App setup ---------------------------------------------------------
 app = Dash(
     __name__, 
     use_pages=True,
+    background_callback_manager=background_callback_manager,
     external_stylesheets=[dbc.themes.COSMO,
                           dbc.icons.FONT_AWESOME]
     )
 
 app.config.suppress_callback_exceptions = True
 
+# Flask server for WSGI workers (see wsgi.py) and the cache they share
+server = app.server
+init_cache(server)
+
 app.layout = html.Div([
     home_menu_btn(),
     offcanvas.home_sidebar(), 
@@ -26,16 +39,15 @@ app.layout = html.Div([
 
 # Callbacks ---------------------------------------------------------
 # # Home Sidebar -----------------------------------------------
-@callback(
+# Flipped in the browser - assets/scripts.js
+clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggle_offcanvas'),
     Output("offcanvas-home-sidebar", "is_open"),
     Input("offcanvas_home_btn", "n_clicks"),
     State("offcanvas-home-sidebar", "is_open"),
 )
-def toggle_offcanvas(n1, is_open):
-    if n1:
-        return not is_open
-    return is_open
 
 # Main --------------------------------------------------------------
+# Development server only - production runs wsgi:server under gunicorn
 if __name__ == '__main__':
-	app.run_server(debug=True)
\ No newline at end of file
+	app.run_server(debug=os.getenv('DASH_DEBUG', 'true').lower() == 'true')
\ No newline at end of file
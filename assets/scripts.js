@@ -1,3 +1,49 @@
-document.getElementById('sidebar').addEventListener('mouseout', function() {
-    this.style.width = '65px';
-});
\ No newline at end of file
+// --- Clientside callbacks -------------------------------------------
+// Pure UI state lives here so it never costs a round trip to Flask.
+// Registered from python with ClientsideFunction('ui', '<name>').
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        // Flip an offcanvas sidebar open/closed from its menu button
+        toggle_offcanvas: function(n_clicks, is_open) {
+            if (n_clicks) {
+                return !is_open;
+            }
+            return is_open;
+        },
+
+        // Copy the box-selected x range into click_store, clear it on well change
+        manage_store_data: function(selected_data, dropdown_value) {
+            const triggered = dash_clientside.callback_context.triggered;
+            if (!triggered || triggered.length === 0) {
+                return dash_clientside.no_update;
+            }
+            const input_id = triggered[0].prop_id.split('.')[0];
+
+            if (input_id === 'grp_ops') {
+                if (selected_data && selected_data.range) {
+                    const range = selected_data.range.x;
+                    return {'start': range[0], 'end': range[1]};
+                }
+                return dash_clientside.no_update;
+            } else if (input_id === 'well_name_id') {
+                return null;
+            }
+            return dash_clientside.no_update;
+        },
+
+        // Pixel width of a rendered graph, so the server fetches about one point per pixel
+        graph_width: function(graph_id) {
+            const graph = document.getElementById(graph_id);
+            const width = graph ? Math.round(graph.getBoundingClientRect().width) : 0;
+            return width > 0 ? width : dash_clientside.no_update;
+        },
+    },
+});
+
+// --- Sidebar hover --------------------------------------------------
+const sidebar = document.getElementById('sidebar');
+if (sidebar) {
+    sidebar.addEventListener('mouseout', function() {
+        this.style.width = '65px';
+    });
+}
@@ -7,7 +7,7 @@ import numpy as np
 import pickle
 import io
 from io import BytesIO
-from scipy.interpolate import CubicSpline
+from utils.survey.min_curve import min_curve
 import welleng as we
 import warnings
 import plotly.graph_objects as go
@@ -45,92 +45,15 @@ DF_IN['Inclination'] = DF_IN['Inclination'].astype('float')
 DF_IN['Azimuth'] = DF_IN['Azimuth'].astype('float')
 
 # Classes | Functions -----------------------------------------------
-def calc_min_curve(df_in):
-    df = df_in.copy()
+def calculate_survey(df_in):
+    """
+    Minimum curvature survey for the pasted [Measured Depth, Inclination, Azimuth] table.
 
-    df['Md'] = df['Measured Depth']
-    df['CL'] = np.subtract(df['Measured Depth'], df['Measured Depth'].shift(1))
-    # df['CL'][0] = df["Md"][0]
-    df['Inc'] = df['Inclination']
-    df['Azm'] = df['Azimuth']
-
-    df['Inc 1'] = np.radians(df['Inclination'])
-    df['Inc 2'] = np.radians(df['Inclination'].shift(1))
-    df['Inc 1'][0] = df["Inc"][0]
-    df['Azm 1'] = np.radians(df['Azimuth'])
-    df['Azm 2'] = np.radians(df['Azimuth'].shift(1))
-
-    df['Dls'] = np.divide(np.degrees(np.arccos(np.cos(df['Inc 2'] - df['Inc 1']) - (np.sin(df['Inc 1'])*np.sin(df['Inc 2'])*(1-np.cos(df['Azm 2']-df['Azm 1']))))),df["CL"]) * 100
-    df["Beta"] = df["Dls"].apply(lambda DLS: 1 if DLS == 0 else (2/DLS) * np.tan(np.radians(DLS/2)))
-    df['NS'] = (df['CL'] / 2) * (np.sin( df['Inc 1']) * np.cos(df['Azm 1']) + np.sin( df['Inc 2']) * np.cos(df['Azm 2'])) * df["Beta"]
-    df["EW"] = (df['CL'] / 2) * (np.sin(df['Inc 1']) * np.sin(df['Azm 1']) + np.sin(df['Inc 2']) * np.sin(df['Azm 2'])) * df["Beta"]
-    df["TVD"] = df.apply(lambda row: row["CL"] if row["Inc 1"] == row["Inc 2"] == 0 else (row["CL"] / 2) * (np.cos(np.radians(row["Inc 1"])) + np.cos(np.radians(row["Inc 2"]))) * row["Beta"], axis=1)
-
-    return df
-
-def calulate_survey(df):
-    df.columns = ['MD', 'INC', 'AZI']
-    df['MD'] = df['MD']
-    df['INC'] = df['INC']
-    df['AZI'] = df['AZI']
-    df['I1'] = df['INC'].shift(1)
-    df['A1'] = df['AZI'].shift(1)
-    df['CL'] = df['MD'] - df['MD'].shift(1)
-
-    # If not starting from zero:
-    #       Set the CL to the first MD
-    #       Set the previous Inc to the current Inc
-    df['CL'][0] = df['MD'][0]
-    df['I1'][0] = df['INC'][0]
-
-    res_df = df.apply(
-        lambda x: min_curve_calc(
-            x['CL'],
-             x['I1'],
-             x['INC'],
-             x['A1'],
-             x['AZI']),
-            axis=1,
-            result_type='expand')
-
-    res_df.columns = ['NS', 'EW', 'TVD', 'DLS', 'RF']
-    # resdf['TVD'] = -resdf['TVD']
-
-    df_final = pd.concat([df, res_df], axis=1)
-
-    df_final['NS'] = df_final['NS'].cumsum()
-    df_final['EW'] = df_final['EW'].cumsum()
-    df_final['TVD'] = df_final['TVD'].cumsum()
-    df_final['DLS'] = (np.divide(np.degrees(df_final['DLS']), df_final['CL']) ) * 100
-    return df_final
-
-def min_curve_calc(MD, I1, I2, A1, A2):
-    I1 = np.radians(I1)
-    I2 = np.radians(I2)
-    A1 = np.radians(A1)
-    A2 = np.radians(A2)
-    DLS = np.arccos(np.cos(I2 - I1) - (np.sin(I1)*np.sin(I2)*(1-np.cos(A2-A1))))
-
-    # If they put in a straight line survey or if
-    # there is a survey station with exactly the
-    # same inc and azi as the previous station
-    # This avoids divide by zero problems
-    if DLS == 0:
-        RF = 1
-    else:
-        RF = (2/DLS) * np.tan(DLS/2)
-
-    NS = (MD / 2) * (np.sin(I1) * np.cos(A1) + np.sin(I2) * np.cos(A2)) * RF
-    EW = (MD / 2) * (np.sin(I1) * np.sin(A1) + np.sin(I2) * np.sin(A2)) * RF
-
-    # When starting from zero inclination, TVD == MD
-    if I1 == I2 == 0:
-        TVD = MD
-    else:
-        TVD = (MD / 2) * (np.cos(I1) + np.cos(I2)) * RF
-
-
-    return NS, EW, TVD, DLS, RF
+    Returns:
+    pd.DataFrame: Md, Inc, Az, Tvd, Ns, Ew, Vs, Dls, Dogleg, Rf (see utils.survey.min_curve).
+    """
+    df = df_in.dropna().sort_values('Measured Depth')
+    return min_curve(df['Measured Depth'], df['Inclination'], df['Azimuth'])
 
 def download_surveys(name,df):
     csv_buffer = io.StringIO()
@@ -261,61 +184,6 @@ with c13:
         st.table(SURVEY_DATA_IN)
 
 
-# def interpolate_surveys(DF_IN):
-
-DF = df_out.copy()
-DF["Md"] = DF['Measured Depth']
-DF["CL"] = DF['Measured Depth'] - DF['Measured Depth'].shift(1)
-DF["Inc"] = DF['Inclination']
-DF["Inc2"] = DF['Inclination'].shift(1)
-DF["Azi"] = DF['Azimuth']
-DF["Azi2"] = DF['Azimuth'].shift(1)
-DF['CL'][0] = DF['Md'][0]
-DF['Inc'][0] = DF['Inc2'][0]
-DF = DF.fillna(0)
-
-I1 = np.radians(DF["Inc"])
-I2 = np.radians(DF["Inc2"])
-A1 = np.radians(DF["Azi"])
-A2 = np.radians(DF["Azi2"])
-DLS = np.arccos(np.cos(I2 - I1) - (np.sin(I1) * np.sin(I2) * (1 - np.cos(A2 - A1))))
-CL = DF['Md'] - DF['Md'].shift(1)
-
-if any(DLS) == 0:
-    RF = 1
-else:
-    RF = (2 / DLS) * np.tan(DLS / 2)
-
-NS = (CL / 2) * (np.sin(I1) * np.cos(A1) + np.sin(I2) * np.cos(A2)) * RF
-EW = (CL / 2) * (np.sin(I1) * np.sin(A1) + np.sin(I2) * np.sin(A2)) * RF
-
-# When starting from zero inclination, TVD == MD
-if any(I1) == any(I2) == 0:
-    TVD = CL
-else:
-    TVD = (CL / 2) * (np.cos(I1) + np.cos(I2)) * RF
-
-DF["Md"] = DF['Measured Depth']
-DF['Tvd'] = TVD
-DF["Inc"] = DF['Inclination']
-DF["Azi"] = DF['Azimuth']
-DF['CL'] = CL
-DF['Dls'] = DLS
-DF['Ns'] = NS
-DF['Ew'] = EW
-DF['RF'] = RF
-DF = DF.fillna(0)
-#
-# # df_list = [MD, I1, A1, NS, EW, TVD, DLS, CL, RF ]
-# # df_cols = ["Md", "Inc", "Azi", "Ns", "Ew", "Tvd", "DLS", "CL", "RF"]
-# df_final = DF #  pd.concat(df_list, axis=1, names=df_cols)
-#
-DF['Ns'] = DF['Ns'].cumsum()
-DF['Ew'] = DF['Ew'].cumsum()
-DF['Tvd'] = DF['Tvd'].cumsum()
-DF['Dls'] = (np.divide(np.degrees(DF['Dls']) , DF['CL'])) * 100
-
-    # return DF
+DF = calculate_survey(df_out)
 
-# st.table(interpolate_surveys(DF_IN))
 st.write(DF)
\ No newline at end of file
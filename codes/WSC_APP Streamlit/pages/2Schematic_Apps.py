@@ -9,6 +9,7 @@ import plotly.graph_objects as go
 #Teradata access
 import cpyai as cp
 from utils import queries as q
+from utils.survey.uploads import read_uploaded_survey
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -431,15 +432,11 @@ if show_setup:
             uploaded_file = c1.file_uploader("Choose file type ('.xlsx' or '.csv')", type=['xlsx', 'csv'])
 
             if uploaded_file is not None:
-                try:
-                    SURVEY_DATA = pd.read_excel(uploaded_file)
-                except:
-                    try:
-                        SURVEY_DATA = pd.read_csv(uploaded_file)
-                    except:
-                        print("Error uploading Survey file")
-
-                if SURVEY_DATA.columns is not None:
+                # Parsed once per file content - reruns reuse it
+                SURVEY_DATA = read_uploaded_survey(uploaded_file)
+                if SURVEY_DATA is None:
+                    print("Error uploading Survey file")
+                else:
                     st.success('Survey file successfully uploaded!', icon="✅")
                     # st.markdown("##### Survey data preview")
                     # st.dataframe(SURVEY_DATA.head(5))
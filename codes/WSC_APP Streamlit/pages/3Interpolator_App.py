@@ -4,7 +4,9 @@ import numpy as np
 import pickle
 import io
 from io import BytesIO
-from scipy.interpolate import CubicSpline
+from utils.survey.columns import KEYWORDS, SURVEY_COLUMNS
+from utils.survey.uploads import ingest_survey
+from utils.survey.query import SurveyStations
 import warnings
 import plotly.graph_objects as go
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -18,108 +20,6 @@ st.set_page_config(
 )
 
 # Classes | Functions -----------------------------------------------
-def filter_columns(dataframe):
-    """
-        Filters the input dataframe by keeping only columns with names
-                containing specified keywords.
-
-        Parameters:
-        dataframe (pd.DataFrame): The input dataframe to filter.
-
-        Returns:
-        pd.DataFrame: A new dataframe containing only the filtered columns.
-                If no columns match the keywords, an empty dataframe is returned.
-        """
-
-    keywords = ['depth', 'md', 'measured depth',
-                'inclination', 'inc',
-                'az', 'azi', 'azm','azimuth',
-                'total vertical depth', 'tvd',
-                'vertical section', 'vs',
-                'northings', 'north', 'ns', 'n',
-                'eastings', 'east', 'ew','e'
-                'dogleg','doglegs','dls'
-                ]
-
-    # Create an empty dataframe for storing the filtered columns
-    filtered_dataframe = pd.DataFrame()
-
-    # Loop through the column names and check for the presence of any keyword
-    for column_name in dataframe.columns:
-        for keyword in keywords:
-            if keyword.lower() in column_name.lower():
-                filtered_dataframe[column_name] = dataframe[column_name]
-                break
-
-    filt_df = pd.DataFrame(filtered_dataframe)
-    filt_df.columns = ['Md', 'Inc', 'Azm', 'Tvd', 'Vs', 'Nth', 'Est', 'Dls']
-    filt_df = filt_df.sort_values(by='Md',ascending=True)
-    filt_df = filt_df.reset_index(drop=True).copy()
-    return filt_df
-
-def resample_survey_to_one_foot_intervals_cubic_df(survey_df):
-    """
-    Resamples the input survey dataframe to one-foot intervals using cubic interpolation.
-
-    Parameters:
-    survey_df (pd.DataFrame): The input survey dataframe with columns for "md", "inc", "az", and "tvd".
-
-    Returns:
-    List[np.ndarray]: A list of resampled station arrays, each containing depth, inclination, azimuth, and TVD.
-    """
-    # Initialize an empty df to store the resampled stations
-    resampled_df = pd.DataFrame()
-    svy_df = pd.DataFrame()
-
-    try:
-        svy_df = filter_columns(survey_df)
-    except:
-        st.markdown(f'''**Parsing Error:** Could not find the correct column names! 
-        - Columns needed ["md", "inc", "az", "tvd", "vs", "ns", "ew", "dls]''')
-
-    # Loop through each pair of consecutive stations in the filtered survey dataframe
-    for i in range(len(svy_df) - 1):
-        # Get the current station and the next station
-        station1 = svy_df.iloc[i]
-        station2 = svy_df.iloc[i + 1]
-
-        # Extract depth, inclination, azimuth, and TVD for each station
-        depth1, inclination1, azimuth1, tvd1, vs1, ns1, ew1, dls1 = station1
-        depth2, inclination2, azimuth2, tvd2, vs2, ns2, ew2, dls2 = station2
-
-        # Calculate the number of intervals between the two depths (rounded to the nearest integer)
-        intervals = int(depth2 - depth1)
-
-        # Create an array of depths at one-foot intervals between the two stations
-        depths = np.linspace(depth1, depth2, intervals + 1)
-
-        # Perform cubic interpolation for inclination, azimuth, and TVD between the two stations
-        inclinations_spline = CubicSpline([depth1, depth2], [inclination1, inclination2])
-        azimuths_spline = CubicSpline([depth1, depth2], [azimuth1, azimuth2])
-        tvds_spline = CubicSpline([depth1, depth2], [tvd1, tvd2])
-        vss_spline = CubicSpline([depth1, depth2], [vs1, vs2])
-        ns_spline = CubicSpline([depth1, depth2], [ns1, ns2])
-        ew_spline = CubicSpline([depth1, depth2], [ew1, ew2])
-        dls_spline = CubicSpline([depth1, depth2], [dls1, dls2])
-
-        # Evaluate the interpolated values at the resampled depths
-        inclinations = inclinations_spline(depths)
-        azimuths = azimuths_spline(depths)
-        tvds = tvds_spline(depths)
-        vss = vss_spline(depths)
-        ns = vss_spline(depths)
-        ew = vss_spline(depths)
-        dls = vss_spline(depths)
-
-        # Combine the resampled depths, inclinations, azimuths, TVDs, VSs into a single array
-        stations = np.column_stack((depths, inclinations, azimuths, tvds, vss,ns, ew, dls))
-
-        # Append the resampled stations to the dataframe, excluding the last station to avoid duplicates
-        resampled_df = resampled_df.append(pd.DataFrame(stations[:-1], columns=['Md', 'Inc', 'Az', 'Tvd', 'Vs', 'Ns', 'Ew', 'Dls']),
-                                           ignore_index=True)
-        resampled_df = resampled_df.ffill()
-    return resampled_df
-
 def download_surveys(name,df):
     csv_buffer = io.StringIO()
     df.to_csv(csv_buffer, index=False)
@@ -206,6 +106,7 @@ def plot_surveys(df1, df2):
 # Globals -----------------------------------------------------------
 SURVEY_DATA_ORIGINAL = pd.DataFrame()
 SURVEY_DATA = pd.DataFrame()
+SURVEY_STATIONS = pd.DataFrame()
 SURVEYS_UPLOADED = False
 SUCCESS_CHECK_RESULT_c11 = True
 FILTERED_SRVY_MD_DF = pd.DataFrame()
@@ -276,25 +177,21 @@ with sb:
     # Create file uploader and check files type
     uploaded_file = sb.file_uploader("Choose file type ('.xlsx' or '.csv')", type=['xlsx', 'csv'])
 
-    # Get Survey data and resample to 1' intervals
+    # Get Survey data and resample to 1' intervals - cached on the file content, reruns reuse it
     if uploaded_file is not None:
         err_msg.empty()
-        try:
-            SURVEY_DATA = pd.read_excel(uploaded_file)
-            SURVEY_DATA_ORIGINAL = SURVEY_DATA.copy()
-        except:
-            try:
-                SURVEY_DATA = pd.read_csv(uploaded_file)
-                SURVEY_DATA_ORIGINAL = SURVEY_DATA.copy()
-            except:
-                st.error("Error uploading Survey csv file...")
-
-        if SURVEY_DATA.columns is not None:
-            try:
-                SURVEYS_UPLOADED = True
-                SURVEY_DATA = resample_survey_to_one_foot_intervals_cubic_df(SURVEY_DATA)
-            except:
-                st.error('Please ensure you Survey file has the proper columns')
+        survey = ingest_survey(uploaded_file, names=SURVEY_COLUMNS, keywords=KEYWORDS)
+
+        if survey['raw'] is None:
+            st.error("Error uploading Survey csv file...")
+        else:
+            SURVEYS_UPLOADED = True
+            SURVEY_DATA_ORIGINAL = survey['raw']
+            SURVEY_STATIONS = survey['stations']
+            SURVEY_DATA = survey['resampled']
+            if survey['error'] is not None:
+                st.markdown(f'''**Parsing Error:** Could not find the correct column names! 
+        - Columns needed ["md", "inc", "az", "tvd", "vs", "ns", "ew", "dls]''')
 
     # Download Interpolated surveys
     st.markdown('---')
@@ -386,23 +283,21 @@ else:
 if SURVEYS_UPLOADED and SURVEY_DATA is not None:
     try:
         c21, c22 = st.columns([0.5, 0.5])
-        temp_srvy = SURVEY_DATA.copy()
-        temp_srvy['Md'] = temp_srvy['Md'].astype('int')
-        temp_srvy['Tvd'] = temp_srvy['Tvd'].astype('int')
-        temp_srvy = temp_srvy.reset_index(drop=True)
+        # Lookups go straight to the stations - any depth, no one-foot table or int casting
+        stations = SurveyStations.from_frame(SURVEY_STATIONS)
 
         # # Ensure only one slider is used at a time
         if SLD_MD_MAX > 0:
-            FILTERED_SRVY_MD_DF = temp_srvy[(temp_srvy['Md'] <= SLD_MD_MAX) & (temp_srvy['Md'] >= SLD_MD_MIN)].round(2).reset_index(drop=True)
+            FILTERED_SRVY_MD_DF = stations.interpolate_at_md(np.arange(SLD_MD_MIN, SLD_MD_MAX + 1)).dropna().round(2)
             output_md_data = c11.dataframe(FILTERED_SRVY_MD_DF.copy() ,use_container_width=True)
         if SLD_MD_SINGLE > 0:
-            FILTERED_SRVY_MD_DF = temp_srvy[(temp_srvy['Md'] == SLD_MD_SINGLE)].round(2).reset_index(drop=True)
+            FILTERED_SRVY_MD_DF = stations.interpolate_at_md([SLD_MD_SINGLE]).dropna().round(2)
             output_md_data = c11.dataframe(FILTERED_SRVY_MD_DF.copy() ,use_container_width=True)
         if SLD_TVD_MAX > 0:
-            FILTERED_SRVY_TVD_DF = temp_srvy[(temp_srvy['Tvd'] == SLD_TVD_MAX)  & (temp_srvy['Md'] >= SLD_TVD_MIN)].round(2).reset_index(drop=True)
+            FILTERED_SRVY_TVD_DF = stations.interpolate_at_tvd(np.arange(SLD_TVD_MIN, SLD_TVD_MAX + 1)).dropna().round(2)
             output_tvd_data = c11.dataframe(FILTERED_SRVY_TVD_DF.copy(), use_container_width=True)
         if SLD_TVD_SINGLE > 0:
-            FILTERED_SRVY_MD_DF = temp_srvy[(temp_srvy['Tvd'] == SLD_TVD_SINGLE)].round(2).reset_index(drop=True)
+            FILTERED_SRVY_MD_DF = stations.interpolate_at_tvd([SLD_TVD_SINGLE], first=False).drop(columns='Query').round(2)
             output_md_data = c11.dataframe(FILTERED_SRVY_MD_DF.copy(), use_container_width=True)
 
         with st.expander('Original - Survey File'):
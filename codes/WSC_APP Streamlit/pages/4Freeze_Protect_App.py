@@ -4,7 +4,9 @@ import numpy as np
 import warnings
 import plotly.graph_objects as go
 warnings.simplefilter(action='ignore', category=FutureWarning)
-from scipy.interpolate import CubicSpline
+from utils.survey.columns import FPA_KEYWORDS, FPA_COLUMNS
+from utils.survey.uploads import ingest_survey
+from utils.survey.query import SurveyStations
 from datetime import datetime
 import pickle
 import plotly_express as px
@@ -71,95 +73,26 @@ def check_column_not_zero(df, column_name):
 
     return df[column_name].ne(0).all()
 
-def filter_columns(dataframe):
+def load_survey_file(uploaded_file):
     """
-        Filters the input dataframe by keeping only columns with names
-                containing specified keywords.
-
-        Parameters:
-        dataframe (pd.DataFrame): The input dataframe to filter.
-
-        Returns:
-        pd.DataFrame: A new dataframe containing only the filtered columns.
-                If no columns match the keywords, an empty dataframe is returned.
-        """
-
-    keywords = ['depth', 'md', 'measured depth',
-                'inclination', 'inc',
-                'az', 'azi', 'azm','azimuth',
-                'total vertical depth', 'tvd',
-                'vertical section', 'vs']
-
-    # Create an empty dataframe for storing the filtered columns
-    filtered_dataframe = pd.DataFrame()
-
-    # Loop through the column names and check for the presence of any keyword
-    for column_name in dataframe.columns:
-        for keyword in keywords:
-            if keyword.lower() in column_name.lower():
-                filtered_dataframe[column_name] = dataframe[column_name]
-                break
-
-    filt_df = pd.DataFrame(filtered_dataframe)
-    filt_df.columns = ['Md', 'Inc', 'Azm', 'Tvd', 'Vs']
-    filt_df = filt_df.sort_values(by='Md',ascending=True)
-    filt_df = filt_df.reset_index(drop=True).copy()
-    return filt_df
-
-def resample_survey_to_one_foot_intervals_cubic_df(survey_df):
-    """
-    Resamples the input survey dataframe to one-foot intervals using cubic interpolation.
+    Reads, filters and resamples the uploaded survey to one-foot intervals. Cached on the
+    file content (see utils.survey.uploads), so widget reruns do not re-read the file.
 
     Parameters:
-    survey_df (pd.DataFrame): The input survey dataframe with columns for "md", "inc", "az", and "tvd".
+    uploaded_file (UploadedFile): The survey file from st.file_uploader.
 
     Returns:
-    List[np.ndarray]: A list of resampled station arrays, each containing depth, inclination, azimuth, and TVD.
+    tuple: The survey stations (md, inc, az, tvd, vs as in the file) and the same
+    columns at one-foot measured depth intervals, for display.
     """
-    # Initialize an empty df to store the resampled stations
-    resampled_df = pd.DataFrame()
-    svy_df = pd.DataFrame()
+    survey = ingest_survey(uploaded_file, names=FPA_COLUMNS, keywords=FPA_KEYWORDS)
 
-    try:
-        svy_df = filter_columns(survey_df)
-    except:
+    if survey['raw'] is None:
+        print("Error uploading Survey file")
+    elif survey['error'] is not None:
         st.write('Could not find the correct column names for reference. Need {"md", "inc", "az", "tvd"}')
 
-    # Loop through each pair of consecutive stations in the filtered survey dataframe
-    for i in range(len(svy_df) - 1):
-        # Get the current station and the next station
-        station1 = svy_df.iloc[i]
-        station2 = svy_df.iloc[i + 1]
-
-        # Extract depth, inclination, azimuth, and TVD for each station
-        depth1, inclination1, azimuth1, tvd1, vs1 = station1
-        depth2, inclination2, azimuth2, tvd2, vs2 = station2
-
-        # Calculate the number of intervals between the two depths (rounded to the nearest integer)
-        intervals = int(depth2 - depth1)
-
-        # Create an array of depths at one-foot intervals between the two stations
-        depths = np.linspace(depth1, depth2, intervals + 1)
-
-        # Perform cubic interpolation for inclination, azimuth, and TVD between the two stations
-        inclinations_spline = CubicSpline([depth1, depth2], [inclination1, inclination2])
-        azimuths_spline = CubicSpline([depth1, depth2], [azimuth1, azimuth2])
-        tvds_spline = CubicSpline([depth1, depth2], [tvd1, tvd2])
-        vss_spline = CubicSpline([depth1, depth2], [vs1, vs2])
-
-        # Evaluate the interpolated values at the resampled depths
-        inclinations = inclinations_spline(depths)
-        azimuths = azimuths_spline(depths)
-        tvds = tvds_spline(depths)
-        vss = vss_spline(depths)
-
-        # Combine the resampled depths, inclinations, azimuths, TVDs, VSs into a single array
-        stations = np.column_stack((depths, inclinations, azimuths, tvds, vss))
-
-        # Append the resampled stations to the dataframe, excluding the last station to avoid duplicates
-        resampled_df = resampled_df.append(pd.DataFrame(stations[:-1], columns=['md', 'inc', 'az', 'tvd', 'vs']),
-                                           ignore_index=True)
-    return resampled_df
+    return survey['stations'], survey['resampled']
 
 def save_pkl(df1, df2, df3):
     with BytesIO() as buffer:
@@ -175,6 +108,11 @@ def load_pkl(file):
 def convert_df(df):
     return df.to_csv().encode('utf-8')
 
+@st.cache_resource(max_entries=8, show_spinner=False)
+def survey_stations(stations_df):
+    """SurveyStations built once per survey instead of on every rerun - blank sheet rows skipped."""
+    return SurveyStations.from_frame(stations_df.dropna(subset=list(stations_df.columns[:3])))
+
 # Globals Variables -------------------------------------------------
 # todo: set as sesions state varibles
 WELL_NAME = ""
@@ -182,6 +120,7 @@ WELL_NAME = ""
 WELL_INFO = pd.DataFrame()
 DF_INPUT = pd.DataFrame()
 SURVEY_DATA = pd.DataFrame()
+SURVEY_STATIONS = pd.DataFrame()    # uploaded stations - saved .pkl files only keep SURVEY_DATA
 DF_PUMP_SCHEDULE = pd.DataFrame()
 SURVEYS_UPLOADED = False
 MUD_GRADIENT = 0.052
@@ -273,19 +212,12 @@ with tab_setup:
 
             # Get Survey data and resample to 1' intervals
             if uploaded_file is not None:
-                try:
-                    SURVEY_DATA = pd.read_excel(uploaded_file)
-                except:
-                    try:
-                        SURVEY_DATA = pd.read_csv(uploaded_file)
-                    except:
-                        print("Error uploading Survey file")
+                SURVEY_STATIONS, SURVEY_DATA = load_survey_file(uploaded_file)
 
                 if SURVEY_DATA.columns is not None:
                     success_check_c12.success(' Survey file successfully uploaded!', icon="✅")
                     SURVEYS_UPLOADED = True
                     SUCCESS_CHECK_RESULT_C12 = True
-                    SURVEY_DATA = resample_survey_to_one_foot_intervals_cubic_df(SURVEY_DATA)
 
         # Preview and QC data - Save
         with c13:
@@ -374,19 +306,12 @@ with tab_setup:
 
                 # Get Survey data and resample to 1' intervals
                 if uploaded_file is not None:
-                    try:
-                        SURVEY_DATA = pd.read_excel(uploaded_file)
-                    except:
-                        try:
-                            SURVEY_DATA = pd.read_csv(uploaded_file)
-                        except:
-                            print("Error uploading Survey file")
+                    SURVEY_STATIONS, SURVEY_DATA = load_survey_file(uploaded_file)
 
                     if SURVEY_DATA.columns is not None:
                         success_check_c12.success(' Survey file successfully uploaded!', icon="✅")
                         SURVEYS_UPLOADED = True
                         SUCCESS_CHECK_RESULT_C12 = True
-                        SURVEY_DATA = resample_survey_to_one_foot_intervals_cubic_df(SURVEY_DATA)
            else:
                 c12.markdown('### Step 2')  # ------------------------------------
                 c12.markdown(" - Upload your Survey Data (Md, Inc°, Azm°, Tvd, Vs)")
@@ -472,10 +397,10 @@ with tab_analysis:
         """
         c21.markdown(f'{txt_details}')
 
-    srvy_data = SURVEY_DATA.copy()
-    if srvy_data is not None:
-        srvy_data['Fluid Btm MD'] = np.round(srvy_data['md'])
-        # srvy_data
+    if SURVEY_DATA is not None:
+        # TVD at any fluid depth straight from the survey stations - the one-foot
+        # table is for display, and only stands in for a template or saved .pkl
+        stations = survey_stations(SURVEY_DATA if SURVEY_STATIONS.empty else SURVEY_STATIONS)
 
         # Create H20 fluid
         h20_fluid = pd.Series(np.arange(0, PRE_FLUSH_VOLUME, 1) + 1)
@@ -501,8 +426,7 @@ with tab_analysis:
         df_pump_schedule['Fluid Top MD'] = np.zeros(len(df_pump_schedule))
         df_pump_schedule['Fluid Btm MD'] = round(np.divide(df_fluid['Cuml bbl'], num_surf_int_csg_capacity),0)
 
-        df_ps_temp = df_pump_schedule.merge(srvy_data[['Fluid Btm MD','tvd']],on='Fluid Btm MD', how="left")
-        df_pump_schedule['Fluid Btm Tvd'] = df_ps_temp.loc[:,'tvd']
+        df_pump_schedule['Fluid Btm Tvd'] = stations.interpolate_at_md(df_pump_schedule['Fluid Btm MD'])['Tvd'].to_numpy()
         df_pump_schedule['Fluid Hydrostatic Psi'] = np.round(np.multiply(df_pump_schedule['Fluid Btm Tvd'],
                                                             df_pump_schedule['Fluid Weight (ppg)']) * MUD_GRADIENT)
         df_pump_schedule['Mud Top MD'] = df_pump_schedule['Fluid Top MD']
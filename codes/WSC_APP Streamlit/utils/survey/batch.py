@@ -0,0 +1,130 @@
+import argparse
+import os
+import sys
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from concurrent.futures import ProcessPoolExecutor
+from utils.survey.columns import SURVEY_COLUMNS
+from utils.survey.ingest import read_survey, detect_stations, SURVEY_EXTENSIONS
+from utils.survey.query import SurveyStations
+
+# Globals -----------------------------------------------------------
+COMBINED_FILE = 'surveys.parquet'
+POSITION_COLUMNS = ['Tvd', 'Ns', 'Ew', 'Vs']
+
+# --- Inputs --------------------------------------------------------
+def collect_surveys(source) -> list:
+    """
+        (file name, bytes) for every csv/xlsx survey in a folder (recursive) or a zip,
+        named by the path relative to the folder or zip root (e.g. padA/W1.xlsx).
+        The bytes travel to the worker processes, so zip members are read once here.
+        """
+    is_survey = lambda name: name.lower().endswith(SURVEY_EXTENSIONS) and not os.path.basename(name).startswith(('~$', '.'))
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return [(name, archive.read(name)) for name in sorted(archive.namelist()) if is_survey(name)]
+
+    surveys = []
+    for root, _, files in os.walk(source):
+        for name in sorted(files):
+            if is_survey(name):
+                with open(os.path.join(root, name), 'rb') as f:
+                    surveys.append((os.path.relpath(os.path.join(root, name), source), f.read()))
+    return surveys
+
+def survey_well(name):
+    """
+        Well for a collected survey - its relative path without the extension,
+        so padA/W1.xlsx and padB/W1.xlsx stay two wells (padA/W1, padB/W1).
+        """
+    return os.path.splitext(name)[0].replace(os.sep, '/')
+
+# --- Per well ------------------------------------------------------
+def interpolate_survey(name, data, step=1.0, out_dir=None, recompute=False) -> dict:
+    """
+        Column detection, minimum curvature and resampling for one survey file,
+        written to <out_dir>/<well>.csv when out_dir is given.
+        Station Tvd/Ns/Ew/Vs come from the file when the detected column layout
+        has them (a file matching only Md/Inc/Az has its others ignored) and
+        from minimum curvature otherwise, or always with recompute.
+        Runs in a worker process - errors come back in the result instead of raising.
+
+        Returns:
+        dict: well, rows, positions (the POSITION_COLUMNS taken from the file),
+        error and df (SURVEY_COLUMNS every `step` ft plus the final station).
+        """
+    well = survey_well(name)
+    try:
+        stations_df = detect_stations(read_survey(data, name))
+        if recompute:
+            stations_df = stations_df[['Md', 'Inc', 'Az']]
+        positions = [col for col in POSITION_COLUMNS if col in stations_df]
+        stations = SurveyStations.from_frame(stations_df)
+        md = np.append(np.arange(np.ceil(stations.md[0]), stations.md[-1], step), stations.md[-1])
+        df = stations.interpolate_at_md(md)
+        if out_dir is not None:
+            path = os.path.join(out_dir, *f'{well}.csv'.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Arrow's writer - DataFrame.to_csv float formatting is most of a well's run time
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+        return {'well': well, 'rows': len(df), 'positions': positions, 'error': None, 'df': df}
+    except Exception as e:
+        return {'well': well, 'rows': 0, 'positions': [], 'error': str(e), 'df': None}
+
+# --- Batch ---------------------------------------------------------
+def run_batch(source, out_dir, step=1.0, workers=None, recompute=False) -> list:
+    """
+        Interpolates every survey in a folder or zip across a process pool.
+        Writes <out_dir>/<well>.csv per well (subfolders kept) and one
+        surveys.parquet with a Well column. Raises ValueError before any work
+        when two files map to the same well (e.g. W1.csv and W1.xlsx).
+
+        Returns:
+        list: per well {well, rows, positions, error} in input order.
+        """
+    surveys = collect_surveys(source)
+    wells = pd.Series([survey_well(name) for name, _ in surveys])
+    duplicated = sorted(set(wells[wells.duplicated()]))
+    if duplicated:
+        raise ValueError(f'More than one survey file for well(s) {duplicated}')
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(interpolate_survey, *zip(*surveys), [step] * len(surveys),
+                                [out_dir] * len(surveys), [recompute] * len(surveys))) if surveys else []
+
+    frames = [result['df'].assign(Well=result['well']) for result in results if result['df'] is not None]
+    if frames:
+        combined = pd.concat(frames, ignore_index=True)[['Well'] + SURVEY_COLUMNS]
+        combined.to_parquet(os.path.join(out_dir, COMBINED_FILE), index=False)
+
+    return [{key: result[key] for key in ('well', 'rows', 'positions', 'error')} for result in results]
+
+
+if __name__ == '__main__':
+    # e.g. python -m utils.survey.batch pad_surveys.zip --out data/interpolated
+    parser = argparse.ArgumentParser(description='Interpolate every survey file in a folder or zip')
+    parser.add_argument('source', help='folder or .zip of survey .csv/.xlsx files, one well per file')
+    parser.add_argument('--out', default='interpolated_surveys', help='output folder')
+    parser.add_argument('--step', type=float, default=1.0, help='output spacing in ft')
+    parser.add_argument('--workers', type=int, default=None, help='processes, default one per cpu')
+    parser.add_argument('--recompute', action='store_true',
+                        help='ignore the files\' Tvd/Ns/Ew/Vs and compute them from Md/Inc/Az by minimum curvature')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    summary = run_batch(args.source, args.out, step=args.step, workers=args.workers, recompute=args.recompute)
+    elapsed = time.perf_counter() - start_time
+
+    for result in summary:
+        positions = f'file {"/".join(result["positions"])}' if result['positions'] else 'min curve'
+        status = f'{result["rows"]} rows, {positions}' if result['error'] is None else f'FAILED - {result["error"]}'
+        print(f'{result["well"]:<30} {status}')
+    failed = sum(result['error'] is not None for result in summary)
+    print(f'{len(summary) - failed}/{len(summary)} wells in {elapsed:.2f}s -> {args.out}')
+    if failed or not summary:
+        sys.exit(1)
@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Globals -----------------------------------------------------------
+# Header keywords in the order the columns are expected in the file
+KEYWORDS = ['depth', 'md', 'measured depth',
+            'inclination', 'inc',
+            'az', 'azi', 'azm', 'azimuth',
+            'total vertical depth', 'tvd',
+            'vertical section', 'vs',
+            'northings', 'north', 'ns', 'n',
+            'eastings', 'east', 'ew',
+            'dogleg', 'doglegs', 'dls'
+            ]
+FPA_KEYWORDS = KEYWORDS[:KEYWORDS.index('vs') + 1]
+
+# Names given to the matched columns - Interpolator (full survey) / Freeze Protect (md..vs)
+SURVEY_COLUMNS = ['Md', 'Inc', 'Az', 'Tvd', 'Vs', 'Ns', 'Ew', 'Dls']
+FPA_COLUMNS = ['md', 'inc', 'az', 'tvd', 'vs']
+
+def filter_columns(dataframe, names=SURVEY_COLUMNS, keywords=KEYWORDS):
+    """
+        Keeps only the columns whose header contains one of the keywords,
+        renames them (in file order) and sorts the survey by measured depth.
+
+        Parameters:
+        dataframe (pd.DataFrame): The uploaded survey.
+        names (list): Names for the matched columns, the first one is the measured depth.
+        keywords (list): Lower case header keywords.
+
+        Returns:
+        pd.DataFrame: The renamed columns sorted by measured depth.
+        Raises ValueError when the number of matched columns differs from names.
+        """
+    matched = [column_name for column_name in dataframe.columns
+               if any(keyword in str(column_name).lower() for keyword in keywords)]
+    if len(matched) != len(names):
+        raise ValueError(f'Matched {len(matched)} survey columns {matched}, expected {names}')
+
+    filt_df = dataframe[matched].copy()
+    filt_df.columns = names
+    filt_df = filt_df.sort_values(by=names[0], ascending=True)
+    return filt_df.reset_index(drop=True)
@@ -0,0 +1,47 @@
+import io
+import pandas as pd
+from utils.survey.columns import filter_columns, KEYWORDS, FPA_KEYWORDS, SURVEY_COLUMNS
+
+# Globals -----------------------------------------------------------
+SURVEY_EXTENSIONS = ('.csv', '.xlsx')
+
+# Column layouts tried in turn - full survey, Freeze Protect style (md..vs), directional only
+COLUMN_LAYOUTS = [
+    (SURVEY_COLUMNS, KEYWORDS),
+    (SURVEY_COLUMNS[:5], FPA_KEYWORDS),
+    (SURVEY_COLUMNS[:3], KEYWORDS[:KEYWORDS.index('azimuth') + 1]),
+    ]
+
+def read_survey(data, name='') -> pd.DataFrame:
+    """
+        Reads an uploaded or on-disk survey file - Excel first, then csv, as the pages do.
+
+        Parameters:
+        data (bytes | file like): File contents.
+        name (str): File name, only used to pick the reader to try first.
+
+        Returns:
+        pd.DataFrame: The raw survey sheet.
+        """
+    data = data if isinstance(data, bytes) else data.read()
+    readers = [pd.read_excel, pd.read_csv]
+    if name.lower().endswith('.csv'):
+        readers.reverse()
+    for reader in readers:
+        try:
+            return reader(io.BytesIO(data))
+        except Exception as e:
+            error = e
+    raise ValueError(f'Could not read survey file {name}: {error}')
+
+def detect_stations(survey_df) -> pd.DataFrame:
+    """
+        Survey stations from a raw sheet with the first column layout that
+        matches (see COLUMN_LAYOUTS). Raises ValueError when none does.
+        """
+    for names, keywords in COLUMN_LAYOUTS:
+        try:
+            return filter_columns(survey_df, names=names, keywords=keywords).dropna(subset=names[:3])
+        except ValueError:
+            continue
+    raise ValueError(f'No survey columns found in {list(survey_df.columns)}')
@@ -0,0 +1,202 @@
+import time
+import numpy as np
+import pandas as pd
+from utils.survey.columns import SURVEY_COLUMNS
+from utils.survey.min_curve import course, min_curve, DLS_COURSE
+
+# Globals -----------------------------------------------------------
+TVD_TOLERANCE = 1e-7    # ft - TVD inversion stops once every query is this close
+MAX_ITERATIONS = 60     # bisection alone reaches float precision well inside this
+
+class SurveyStations:
+    """
+        Survey stations that answer depth queries directly along the minimum
+        curvature arc between stations - no one-foot table is built.
+        Tvd/Ns/Ew/Vs at the stations come from the file when given and from
+        utils.survey.min_curve otherwise.
+        """
+    def __init__(self, md, inc, az, tvd=None, ns=None, ew=None, vs=None, vs_azimuth=None):
+        self.md = np.asarray(md, dtype=float)
+        self.inc = np.radians(np.asarray(inc, dtype=float))
+        self.az = np.radians(np.asarray(az, dtype=float))
+        if len(self.md) < 2 or np.any(np.diff(self.md) < 0):
+            raise ValueError('Need at least two stations sorted by measured depth')
+
+        # Station positions from the file take precedence - the trajectory is only computed for what is missing
+        computed = (min_curve(self.md, np.degrees(self.inc), np.degrees(self.az))
+                    if tvd is None or ns is None or ew is None else None)
+        self.tvd = computed['Tvd'].to_numpy() if tvd is None else np.asarray(tvd, dtype=float)
+        self.ns = computed['Ns'].to_numpy() if ns is None else np.asarray(ns, dtype=float)
+        self.ew = computed['Ew'].to_numpy() if ew is None else np.asarray(ew, dtype=float)
+
+        if vs_azimuth is None and vs is not None:
+            # Best fit direction of the file's vertical section
+            (cos_v, sin_v), *_ = np.linalg.lstsq(np.column_stack([self.ns, self.ew]), np.asarray(vs, dtype=float), rcond=None)
+            vs_azimuth = np.degrees(np.arctan2(sin_v, cos_v))
+        elif vs_azimuth is None:
+            vs_azimuth = np.degrees(np.arctan2(self.ew[-1], self.ns[-1]))
+        self.vs_azimuth = vs_azimuth
+        self.vs = (self.ns * np.cos(np.radians(vs_azimuth)) + self.ew * np.sin(np.radians(vs_azimuth))
+                   if vs is None else np.asarray(vs, dtype=float))
+
+        self.cl = np.diff(self.md)
+        self.dogleg = course(self.cl, self.inc[:-1], self.az[:-1], self.inc[1:], self.az[1:])['dogleg']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.dls = np.where(self.cl > 0, np.degrees(self.dogleg) / self.cl * DLS_COURSE, 0)
+        self._segments = self._monotonic_segments()
+
+    @classmethod
+    def from_frame(cls, df, vs_azimuth=None):
+        """Stations from a filter_columns frame - Md/Inc/Az required, Tvd/Ns/Ew/Vs used when present."""
+        cols = {str(col).lower(): col for col in df.columns}
+        get = lambda name: df[cols[name]] if name in cols else None
+        return cls(get('md'), get('inc'), get('az'), tvd=get('tvd'), ns=get('ns'), ew=get('ew'),
+                   vs=get('vs'), vs_azimuth=vs_azimuth)
+
+    # --- Arc between stations --------------------------------------
+    def _arc(self, idx, f):
+        """Direction (radians) and increments a fraction f (0-1) along courses idx - spherical interpolation."""
+        i1, a1, i2, a2 = self.inc[idx], self.az[idx], self.inc[idx + 1], self.az[idx + 1]
+        dl = self.dogleg[idx]
+        t1 = np.stack([np.sin(i1) * np.cos(a1), np.sin(i1) * np.sin(a1), np.cos(i1)])
+        t2 = np.stack([np.sin(i2) * np.cos(a2), np.sin(i2) * np.sin(a2), np.cos(i2)])
+        straight = dl < 1e-9
+        sin_dl = np.where(straight, 1.0, np.sin(dl))
+        w1 = np.where(straight, 1 - f, np.sin((1 - f) * dl) / sin_dl)
+        w2 = np.where(straight, f, np.sin(f * dl) / sin_dl)
+        t = w1 * t1 + w2 * t2
+
+        horizontal = np.hypot(t[0], t[1])
+        inc = np.arctan2(horizontal, t[2])
+        az = np.where(horizontal > 1e-12, np.mod(np.arctan2(t[1], t[0]), 2 * np.pi), a1)
+        return inc, az, course(f * self.cl[idx], i1, a1, inc, az)
+
+    def _at_course(self, idx, f) -> pd.DataFrame:
+        inc, az, step = self._arc(idx, f)
+        vs_az = np.radians(self.vs_azimuth)
+        return pd.DataFrame({
+            'Md': self.md[idx] + f * self.cl[idx],
+            'Inc': np.degrees(inc),
+            'Az': np.degrees(az),
+            'Tvd': self.tvd[idx] + step['tvd'],
+            'Vs': self.vs[idx] + step['ns'] * np.cos(vs_az) + step['ew'] * np.sin(vs_az),
+            'Ns': self.ns[idx] + step['ns'],
+            'Ew': self.ew[idx] + step['ew'],
+            'Dls': self.dls[idx],
+            }, columns=SURVEY_COLUMNS)
+
+    def interpolate_at_md(self, md) -> pd.DataFrame:
+        """
+            Survey values at arbitrary measured depths (any order, non-integer ok).
+            Binary search finds each depth's course; depths outside the survey are NaN.
+            """
+        md = np.atleast_1d(np.asarray(md, dtype=float))
+        idx = np.clip(np.searchsorted(self.md, md, side='left') - 1, 0, len(self.cl) - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = np.where(self.cl[idx] > 0, (md - self.md[idx]) / self.cl[idx], 0)
+        out = self._at_course(idx, np.clip(f, 0, 1))
+        out.loc[(md < self.md[0]) | (md > self.md[-1]) | np.isnan(md), SURVEY_COLUMNS[1:]] = np.nan
+        out['Md'] = md
+        return out
+
+    # --- TVD inversion ---------------------------------------------
+    def _monotonic_segments(self):
+        """(first, last) station of each run where TVD only rises or only falls - flats join the run."""
+        sign = np.sign(np.diff(self.tvd))
+        sign = pd.Series(np.where(sign == 0, np.nan, sign)).ffill().bfill().fillna(1).to_numpy()
+        breaks = np.flatnonzero(np.diff(sign)) + 1
+        starts = np.concatenate([[0], breaks])
+        ends = np.concatenate([breaks, [len(sign)]])
+        return [(s, e, sign[s]) for s, e in zip(starts, ends)]
+
+    def interpolate_at_tvd(self, tvd, first=True) -> pd.DataFrame:
+        """
+            Survey values where the well reaches arbitrary true vertical depths.
+            Each monotonic TVD run is searched with searchsorted, then the arc
+            inside the course is inverted for every query at once.
+            first: shallowest MD per query (NaN when never reached), otherwise every
+            crossing, with a 'Query' column giving the position in tvd.
+            """
+        tvd = np.atleast_1d(np.asarray(tvd, dtype=float))
+        hits_q, hits_idx, hits_dir = [], [], []
+        for n, (start, end, direction) in enumerate(self._segments):
+            seg = self.tvd[start:end + 1] * direction
+            target = tvd * direction
+            # A turning station belongs to the run that ends there
+            inside = ((target >= seg[0]) if n == 0 else (target > seg[0])) & (target <= seg[-1])
+            local = np.clip(np.searchsorted(seg, target[inside], side='left') - 1, 0, end - start - 1)
+            hits_q.append(np.flatnonzero(inside))
+            hits_idx.append(start + local)
+            hits_dir.append(np.full(inside.sum(), direction))
+        q, idx, direction = (np.concatenate(hits) for hits in (hits_q, hits_idx, hits_dir))
+
+        # Newton on the fraction along each course (dTvd/dMd = cos inc), kept
+        # inside a shrinking bracket and falling back to bisection
+        lo, hi = np.zeros(len(q)), np.ones(len(q))
+        f = np.full(len(q), 0.5)
+        target = tvd[q] * direction
+        for _ in range(MAX_ITERATIONS):
+            inc, _, step = self._arc(idx, f)
+            error = (self.tvd[idx] + step['tvd']) * direction - target
+            if np.all(np.abs(error) < TVD_TOLERANCE):
+                break
+            lo, hi = np.where(error < 0, f, lo), np.where(error < 0, hi, f)
+            slope = np.cos(inc) * direction * self.cl[idx]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = f - error / slope
+            f = np.where((newton >= lo) & (newton <= hi), newton, (lo + hi) / 2)
+        out = self._at_course(idx, f)
+        out.insert(0, 'Query', q)
+        out = out.sort_values(['Query', 'Md'], kind='stable')
+
+        if not first:
+            return out.reset_index(drop=True)
+        out = out.drop_duplicates('Query').set_index('Query').reindex(np.arange(len(tvd)))
+        out['Tvd'] = tvd
+        return out.reset_index(drop=True)
+
+
+# --- Benchmark -----------------------------------------------------
+if __name__ == '__main__':
+    from utils.survey.resample import resample_one_foot
+
+    # Build, hold, then a horizontal lateral that dips below 90 and back (TVD not monotonic)
+    md = np.arange(0, 20001, 95.0)
+    inc = np.interp(md, [0, 1500, 5000, 9000, 12000, 20000], [0, 0, 35, 35, 92, 86])
+    az = np.interp(md, [0, 9000, 20000], [355, 10, 25]) % 360
+    stations = SurveyStations(md, inc, az)
+    exact = min_curve(md, inc, az)
+
+    # At the stations the query reproduces the stations, between them it lies on the arc
+    at_stations = stations.interpolate_at_md(md)
+    assert np.allclose(at_stations[['Tvd', 'Ns', 'Ew']], exact[['Tvd', 'Ns', 'Ew']])
+    half = stations.interpolate_at_md(md[:-1] + 47.5)
+    split = min_curve(np.sort(np.concatenate([md, half['Md']])),
+                      np.concatenate([inc, half['Inc']])[np.argsort(np.concatenate([md, half['Md']]))],
+                      np.concatenate([az, half['Az']])[np.argsort(np.concatenate([md, half['Md']]))])
+    assert np.allclose(split.iloc[1::2]['Tvd'], half['Tvd'], atol=1e-6)
+    assert np.isnan(stations.interpolate_at_md([-5, 25000])['Tvd']).all()
+
+    # TVD -> MD -> TVD round trip, and every crossing on the undulating lateral
+    queries = np.random.default_rng(0).uniform(0, exact['Tvd'].max(), 5000)
+    start_time = time.perf_counter()
+    by_tvd = stations.interpolate_at_tvd(queries)
+    tvd_time = time.perf_counter() - start_time
+    assert np.allclose(stations.interpolate_at_md(by_tvd['Md'])['Tvd'], queries, atol=1e-6)
+    # Just above the lateral's first high point: down through it, back up, then down again
+    peak = exact['Tvd'].iloc[stations._segments[0][1]] - 1
+    assert len(stations.interpolate_at_tvd([peak], first=False)) == 3
+
+    md_queries = np.random.default_rng(1).uniform(0, md[-1], 5000)
+    start_time = time.perf_counter()
+    stations.interpolate_at_md(md_queries)
+    md_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    dense = resample_one_foot(exact[['Md', 'Inc', 'Az', 'Tvd']])
+    for value in md_queries[:200]:
+        dense[dense['Md'].astype(int) == int(value)]
+    mask_time = (time.perf_counter() - start_time) * len(md_queries) / 200
+
+    print(f'5000 MD queries {md_time * 1e3:.1f} ms, 5000 TVD queries {tvd_time * 1e3:.1f} ms, '
+          f'one-foot table + masks ~{mask_time * 1e3:.0f} ms')
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Globals -----------------------------------------------------------
+AZIMUTH_COLUMNS = ('Az', 'az', 'Azm', 'azm')     # interpolated the short way round north
+
+def resample_one_foot(survey_df, md_col=None) -> pd.DataFrame:
+    """
+        Resamples a survey to one-foot intervals in a single vectorised pass.
+        Each station pair gets int(md2 - md1) evenly spaced points from md1
+        (the old per-pair two point CubicSpline, which is a straight line),
+        the final station is kept and gaps (NaN) are forward filled.
+
+        Parameters:
+        survey_df (pd.DataFrame): Numeric survey sorted by measured depth (see filter_columns).
+        md_col (str): Measured depth column, defaults to the first column.
+
+        Returns:
+        pd.DataFrame: The same columns at one-foot measured depth intervals.
+        """
+    if len(survey_df) < 2:
+        return survey_df.astype(float).reset_index(drop=True)
+    md_col = survey_df.columns[0] if md_col is None else md_col
+    values = survey_df.to_numpy(dtype=float)
+
+    az = [i for i, col in enumerate(survey_df.columns) if col in AZIMUTH_COLUMNS]
+    for col in az:
+        # Unwrap the readings only - a NaN (often a blank tie-in azimuth) would carry into every later row
+        known = np.isfinite(values[:, col])
+        values[known, col] = np.unwrap(values[known, col], period=360)
+
+    # Points generated for each station pair, the last station closes the survey
+    md = values[:, survey_df.columns.get_loc(md_col)]
+    steps = np.maximum((md[1:] - md[:-1]).astype(int), 0)
+    pair = np.repeat(np.arange(len(steps)), steps)
+    k = np.arange(len(pair)) - np.repeat(np.cumsum(steps) - steps, steps)
+    frac = (k / steps[pair])[:, None]
+
+    out = np.empty((len(pair) + 1, values.shape[1]))
+    out[:-1] = values[pair] + frac * (values[pair + 1] - values[pair])
+    out[-1] = values[-1]
+    if az:
+        out[:, az] = np.mod(out[:, az], 360)
+
+    return pd.DataFrame(out, columns=survey_df.columns).ffill()
+
+
+# --- Benchmark -----------------------------------------------------
+def _legacy_resample(svy_df):
+    # The per-station loop the pages used (DataFrame.append swapped for concat, it is gone in pandas 2)
+    from scipy.interpolate import CubicSpline
+    resampled_df = pd.DataFrame()
+    for i in range(len(svy_df) - 1):
+        station1 = svy_df.iloc[i]
+        station2 = svy_df.iloc[i + 1]
+        depths = np.linspace(station1.iloc[0], station2.iloc[0], int(station2.iloc[0] - station1.iloc[0]) + 1)
+        splines = [CubicSpline([station1.iloc[0], station2.iloc[0]], [station1.iloc[j], station2.iloc[j]])(depths)
+                   for j in range(1, len(svy_df.columns))]
+        stations = np.column_stack([depths] + splines)
+        resampled_df = pd.concat([resampled_df, pd.DataFrame(stations[:-1], columns=svy_df.columns)],
+                                 ignore_index=True)
+        resampled_df = resampled_df.ffill()
+    return resampled_df
+
+if __name__ == '__main__':
+    n_stations = 220
+    rng = np.random.default_rng(0)
+    md = np.concatenate([[0], np.cumsum(rng.uniform(60, 120, n_stations - 1))])
+    md = md * 20000 / md[-1]
+    survey = pd.DataFrame({'Md': md,
+                           'Inc': np.clip(np.cumsum(rng.normal(0.4, 0.3, n_stations)), 0, 92),
+                           'Az': np.mod(np.cumsum(rng.normal(0, 1.5, n_stations)) + 40, 360),
+                           'Tvd': np.cumsum(rng.uniform(40, 100, n_stations)),
+                           'Vs': np.cumsum(rng.uniform(0, 80, n_stations))})
+
+    start_time = time.perf_counter()
+    legacy = _legacy_resample(survey)
+    legacy_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    resampled = resample_one_foot(survey)
+    new_time = time.perf_counter() - start_time
+
+    # Same points as the loop plus the final station (azimuth inside 0-360 here so no wrap)
+    pd.testing.assert_frame_equal(resampled.iloc[:-1], legacy, check_exact=False, rtol=1e-9)
+
+    # Crossing north: 350 -> 10 degrees goes through 0, not 180
+    wrapped = resample_one_foot(pd.DataFrame({'Md': [0, 20], 'Az': [350, 10]}))
+    assert wrapped['Az'].between(0, 360).all() and (wrapped['Az'].iloc[10] % 360) < 1e-9
+
+    # Blank tie-in azimuth - only the tie-in course is unknown, the rest still interpolates
+    blank_tie_in = resample_one_foot(pd.DataFrame({'Md': [0, 10, 20, 30], 'Az': [np.nan, 10, 20, 30]}))
+    assert blank_tie_in['Az'].iloc[:10].isna().all() and np.allclose(blank_tie_in['Az'].iloc[10:], np.arange(10, 31))
+
+    print(f'{md[-1]:.0f} ft, {n_stations} stations -> {len(resampled)} rows')
+    print(f'legacy loop {legacy_time * 1e3:.0f} ms, vectorised {new_time * 1e3:.2f} ms '
+          f'({legacy_time / new_time:.0f}x)')
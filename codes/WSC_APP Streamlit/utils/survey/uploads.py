@@ -0,0 +1,66 @@
+import hashlib
+import streamlit as st
+import pandas as pd
+from utils.survey.columns import filter_columns, KEYWORDS, SURVEY_COLUMNS
+from utils.survey.ingest import read_survey
+from utils.survey.resample import resample_one_foot
+
+# Globals -----------------------------------------------------------
+MAX_CACHED_SURVEYS = 32     # per parse options - st.cache_data drops the oldest beyond this
+
+# Streamlit reruns the page on every widget change. These are keyed on the
+# uploaded bytes' hash (plus parse options) so a rerun reuses the parsed and
+# resampled frames instead of re-reading the file. The bytes themselves are
+# passed as an underscore argument, which st.cache_data leaves out of the key.
+@st.cache_data(max_entries=MAX_CACHED_SURVEYS, show_spinner=False)
+def _read_cached(digest, name, _data):
+    try:
+        return read_survey(_data, name), None
+    except ValueError as e:
+        return None, str(e)
+
+@st.cache_data(max_entries=MAX_CACHED_SURVEYS, show_spinner='Interpolating surveys...')
+def _ingest_cached(digest, name, names, keywords, _data):
+    raw, error = _read_cached(digest, name, _data)
+    if raw is None:
+        return {'raw': None, 'stations': pd.DataFrame(), 'resampled': pd.DataFrame(), 'error': error}
+    try:
+        stations = filter_columns(raw, names=list(names), keywords=list(keywords))
+        error = None
+    except ValueError as e:
+        stations, error = pd.DataFrame(), str(e)
+    return {'raw': raw, 'stations': stations, 'resampled': resample_one_foot(stations), 'error': error}
+
+def _digest(uploaded_file):
+    data = uploaded_file.getvalue()
+    return hashlib.sha256(data).hexdigest(), data
+
+def read_uploaded_survey(uploaded_file) -> pd.DataFrame:
+    """
+        The uploaded survey sheet, parsed once per file content.
+
+        Parameters:
+        uploaded_file (UploadedFile): st.file_uploader result.
+
+        Returns:
+        pd.DataFrame: The raw sheet, None when it is neither Excel nor csv.
+        """
+    digest, data = _digest(uploaded_file)
+    return _read_cached(digest, uploaded_file.name, data)[0]
+
+def ingest_survey(uploaded_file, names=SURVEY_COLUMNS, keywords=KEYWORDS) -> dict:
+    """
+        Parses, detects columns and resamples an uploaded survey once per file
+        content and parse options (see utils.survey.columns.filter_columns).
+
+        Parameters:
+        uploaded_file (UploadedFile): st.file_uploader result.
+        names (list), keywords (list): Column names/keywords passed to filter_columns.
+
+        Returns:
+        dict: raw (sheet, None if unreadable), stations, resampled (one-foot) and
+        error (None, or why the file could not be read or its columns found).
+        Each call gets its own copy, so callers can modify the frames.
+        """
+    digest, data = _digest(uploaded_file)
+    return _ingest_cached(digest, uploaded_file.name, tuple(names), tuple(keywords), data)
@@ -0,0 +1,166 @@
+import math
+import time
+import pandas as pd
+from jinja2 import Environment, DictLoader, StrictUndefined
+
+# Globals -----------------------------------------------------------
+RENDER_BUDGET_MS = 0.5      # per timelog entry - the benchmark fails above this
+
+# --- Template filters ----------------------------------------------
+def fmt_value(value, decimals=0, empty_val='--'):
+    # Summary values are floats - NaN/None means no data for that channel
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return empty_val
+    return f'{value:.{decimals}f}'
+
+def fmt_time(value, format='%m/%d %H:%M'):
+    return pd.Timestamp(value).strftime(format)
+
+# --- Templates -----------------------------------------------------
+# Each entry template renders one summary record `r` (see utils.summary.SUMMARY_FIELDS)
+DEFAULT_TEMPLATE = """\
+Drilling from {{ r.start_md|num }}'md to {{ r.end_md|num }}' md, {{ r.end_tvd|num }}' tvd \r
+    PUW= {{ r.puw|num }} klbs, SOW= {{ r.sow|num }} klbs, RTW= {{ r.rtw|num }} klbs \r
+    ROP= {{ r.rop|num }} fph, WOB= {{ r.wob|num(2) }} klbs \r
+    GPM= {{ r.gpm|num }} gpm, SPP= {{ r.spp|num }} psi, FLOW-OUT= {{ r.fout|num }}% \r
+    RPM= {{ r.rpm|num }} rpm, TQ= {{ r.tq|num(1) }} klbs \r
+    MW= {{ r.mw|num(2) }} ppg, ECD= {{ r.ecd|num(2) }} ppge \r
+Notes:  """
+
+MUD_MOTOR_TEMPLATE = """\
+Drilling w/ mud motor from {{ r.start_md|num }}'md to {{ r.end_md|num }}' md, {{ r.end_tvd|num }}' tvd \r
+    Sliding {{ r.slide_pct|num }}% of on-bottom time \r
+    PUW= {{ r.puw|num }} klbs, SOW= {{ r.sow|num }} klbs, RTW= {{ r.rtw|num }} klbs \r
+    ROP= {{ r.rop|num }} fph, WOB= {{ r.wob|num(2) }} klbs \r
+    GPM= {{ r.gpm|num }} gpm, SPP= {{ r.spp|num }} psi, FLOW-OUT= {{ r.fout|num }}% \r
+    Rotating: RPM= {{ r.rpm|num }} rpm, TQ= {{ r.tq|num(1) }} klbs \r
+    MW= {{ r.mw|num(2) }} ppg, ECD= {{ r.ecd|num(2) }} ppge \r
+Notes:  """
+
+RSS_TEMPLATE = """\
+Drilling w/ RSS from {{ r.start_md|num }}'md to {{ r.end_md|num }}' md, {{ r.end_tvd|num }}' tvd \r
+    PUW= {{ r.puw|num }} klbs, SOW= {{ r.sow|num }} klbs, RTW= {{ r.rtw|num }} klbs \r
+    ROP= {{ r.rop|num }} fph, WOB= {{ r.wob|num(2) }} klbs, RPM= {{ r.rpm|num }} rpm, TQ= {{ r.tq|num(1) }} klbs \r
+    GPM= {{ r.gpm|num }} gpm, SPP= {{ r.spp|num }} psi, FLOW-OUT= {{ r.fout|num }}% \r
+    MW= {{ r.mw|num(2) }} ppg, ECD= {{ r.ecd|num(2) }} ppge \r
+Notes:  """
+
+RSS_MPD_TEMPLATE = """\
+Drilling w/ RSS & MPD from {{ r.start_md|num }}'md to {{ r.end_md|num }}' md, {{ r.end_tvd|num }}' tvd \r
+    PUW= {{ r.puw|num }} klbs, SOW= {{ r.sow|num }} klbs, RTW= {{ r.rtw|num }} klbs \r
+    ROP= {{ r.rop|num }} fph, WOB= {{ r.wob|num(2) }} klbs, RPM= {{ r.rpm|num }} rpm, TQ= {{ r.tq|num(1) }} klbs \r
+    GPM= {{ r.gpm|num }} gpm, SPP= {{ r.spp|num }} psi, FLOW-OUT= {{ r.fout|num }}% \r
+    MW= {{ r.mw|num(2) }} ppg, ECD= {{ r.ecd|num(2) }} ppge, SBP= ___ psi (drilling) / ___ psi (connections) \r
+Notes:  """
+
+# Batch wrapper - every entry rendered in one pass over the records
+BATCH_TEMPLATE = """\
+{% for r in records %}{% if not loop.first %}\r
+\r
+{% endif %}{% if r.std_num is defined and r.std_num is not none %}Stand {{ r.std_num|num }} {% endif %}\
+{{ r.start|hhmm }} - {{ r.end|hhmm }} \r
+{% include entry %}{% endfor %}"""
+
+# --- Formatter registry --------------------------------------------
+class FormatterRegistry:
+    """
+        Timelog formatters keyed by the templater's ops_type value. Templates
+        are compiled once when registered; rendering only fills in a summary
+        record (or a whole batch of them in a single render call).
+    """
+    def __init__(self):
+        self.env = Environment(loader=DictLoader({}), undefined=StrictUndefined,
+                               keep_trailing_newline=True, newline_sequence='\r\n', autoescape=False)
+        self.env.filters['num'] = fmt_value
+        self.env.filters['hhmm'] = fmt_time
+        self._sources = self.env.loader.mapping
+        self._labels = {}
+        self._templates = {}
+        self._batch = self.env.from_string(BATCH_TEMPLATE)
+
+    def register(self, key, label, source):
+        self._sources[key] = source
+        self._labels[key] = label
+        self._templates[key] = self.env.get_template(key)
+
+    def options(self):
+        """Dropdown options for the registered formatters."""
+        return [{'label': label, 'value': key} for key, label in self._labels.items()]
+
+    def _entry(self, key):
+        return key if key in self._templates else 'df'
+
+    def render(self, record, key='df') -> str:
+        """Render one summary record (dict or pandas row)."""
+        return self._templates[self._entry(key)].render(r=dict(record))
+
+    def render_batch(self, df, key='df') -> str:
+        """One entry per row of a summarize_intervals / get_batch_timelog frame."""
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        return self._batch.render(records=records, entry=self._entry(key))
+
+formatters = FormatterRegistry()
+formatters.register('df', 'Default Formatter', DEFAULT_TEMPLATE)
+formatters.register('mmf', 'Mud Motor Formatter', MUD_MOTOR_TEMPLATE)
+formatters.register('rf', 'RSS Formatter', RSS_TEMPLATE)
+formatters.register('rmf', 'RSS w/MPD Formatter', RSS_MPD_TEMPLATE)
+
+
+# --- Benchmark -----------------------------------------------------
+def _legacy_formatter(df):
+    row = df.iloc[0]
+    start_md = f"{fmt_value(row.start_md)}'md"
+    end_md = f"{fmt_value(row.end_md)}' md"
+    end_tvd = f"{fmt_value(row.end_tvd)}' tvd"
+    puw = f'PUW= {fmt_value(row.puw)} klbs'
+    sow = f'SOW= {fmt_value(row.sow)} klbs'
+    rtw = f'RTW= {fmt_value(row.rtw)} klbs'
+    rop = f"ROP= {fmt_value(row.rop)} fph"
+    wob = f"WOB= {fmt_value(row.wob, 2)} klbs"
+    gpm = f'GPM= {fmt_value(row.gpm)} gpm'
+    psi = f'SPP= {fmt_value(row.spp)} psi'
+    flow_out = f'FLOW-OUT= {fmt_value(row.fout)}%'
+    rpm = f'RPM= {fmt_value(row.rpm)} rpm'
+    tq = f'TQ= {fmt_value(row.tq, 1)} klbs'
+    mud_wt = f'MW= {fmt_value(row.mw, 2)} ppg'
+    ecd = f'ECD= {fmt_value(row.ecd, 2)} ppge'
+    return f'''Drilling from {start_md} to {end_md}, {end_tvd} \r
+    {puw}, {sow}, {rtw} \r
+    {rop}, {wob} \r
+    {gpm}, {psi}, {flow_out} \r
+    {rpm}, {tq} \r
+    {mud_wt}, {ecd} \r
+Notes:  '''
+
+if __name__ == '__main__':
+    import sys
+    import numpy as np
+    from utils.summary import SUMMARY_FIELDS
+
+    n = 500
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((n, len(SUMMARY_FIELDS))) * 1000, columns=SUMMARY_FIELDS).round(1)
+    df.loc[::7, 'puw'] = np.nan
+    df.insert(0, 'end', pd.date_range('2023-06-29 06:00', periods=n, freq='15min', tz='America/Anchorage'))
+    df.insert(0, 'start', df['end'] - pd.Timedelta('15min'))
+
+    assert formatters.render(df.iloc[0]) == _legacy_formatter(df.iloc[[0]])
+
+    start_time = time.perf_counter()
+    for i in range(n):
+        _legacy_formatter(df.iloc[[i]])
+    legacy_time = time.perf_counter() - start_time
+
+    timings = {}
+    for key in formatters._templates:
+        start_time = time.perf_counter()
+        formatters.render_batch(df, key)
+        timings[key] = time.perf_counter() - start_time
+
+    print(f'{n} entries: legacy f-string per row {legacy_time:.3f}s')
+    for key, seconds in timings.items():
+        print(f'{key:>4} render_batch {seconds:.3f}s ({seconds / n * 1e3:.3f} ms/entry)')
+
+    worst = max(timings.values()) / n * 1e3
+    if worst > RENDER_BUDGET_MS:
+        sys.exit(f'render time {worst:.3f} ms/entry over the {RENDER_BUDGET_MS} ms budget')
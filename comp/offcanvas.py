@@ -1,5 +1,6 @@
 import dash_bootstrap_components as dbc
 from dash import Input, Output, State, html, dcc
+from comp.formatters import formatters
   
 def home_sidebar():
     return html.Div(
@@ -49,18 +50,23 @@ def templater_sidebar():
                         ], value=3 
                     ),style={'padding': '5px'}
                 ),    
-                 html.Div( # todo: wire up to the formatters
+                html.Div(
                     dcc.Dropdown(
                         id='ops_type',
-                        options=[
-                            {'label': 'Default Formatter', 'value': 'df'},
-                            {'label': 'Mud Motor Formatter', 'value': 'mmf'},
-                            {'label': 'RSS Formatter', 'value': 'rf'},
-                            {'label': 'RSS w/MPD Formatter', 'value': 'rmf'},
-
-                        ], value='df' 
+                        options=formatters.options(),
+                        value='df' 
                     ),style={'padding': '5px'}
                 ),         
+                html.Div(
+                    dcc.Dropdown(
+                        id='timelog_mode',
+                        options=[
+                            {'label': 'Single Timelog Entry', 'value': 'selection'},
+                            {'label': 'Timelog per Stand', 'value': 'stand'},
+                            {'label': 'Timelog per 6 hr Tour', 'value': 'tour'},
+                        ], value='selection'
+                    ),style={'padding': '5px'}
+                ),
                 html.Div(
                     dcc.Dropdown(
                         id='well_name_id',
@@ -2,40 +2,18 @@ import dash_bootstrap_components as dbc
 from dash import Input, Output, State, html, dcc
 import pandas as pd
 import dash_ag_grid as dag
+from comp.formatters import formatters
 
 # Helper Functions --------------------------------------------------
-def wv_default_formatter(df):
-    empty_val = '--'
-    start_md = f"{df.start_md[0]}'md"
-    end_md = f"{df.end_md[0]}' md"
-    end_tvd = f"{df.end_tvd[0]}' tvd"
-    
-    puw = f'PUW= {df.puw[0]} klbs'
-    sow = f'SOW= {df.sow[0]} klbs'
-    rtw = f'RTW= {df.rtw[0]} klbs'
-    
-    rop = f"ROP= {df.rop[0]} fph"
-    wob = f"WOB= {df.wob[0]} klbs"
-    
-    gpm = f'GPM= {df.gpm[0]} gpm'
-    psi = f'SPP= {df.spp[0]} psi'
-    flow_out = f'FLOW-OUT= {df.fout[0]}%'
-    
-    rpm = f'RPM= {df.rpm[0]} rpm'
-    tq = f'TQ= {df.tq[0]} klbs'
-    
-    mud_wt =f'MW= {df.mw[0]} ppg'
-    ecd = f'ECD= {df.ecd[0]} ppge'
-    
-    return f'''Drilling from {start_md} to {end_md}, {end_tvd} \r
-    {puw}, {sow}, {rtw} \r
-    {rop}, {wob} \r
-    {gpm}, {psi}, {flow_out} \r
-    {rpm}, {tq} \r
-    {mud_wt}, {ecd} \r
-Notes:  '''
+def wv_default_formatter(df, ops_type='df'):
+    # Templates are compiled once in comp.formatters - keyed by the ops_type dropdown
+    return formatters.render(df.iloc[0], ops_type)
+
+def wv_batch_formatter(df, ops_type='df'):
+    # One timelog entry per interval, headed by its local time range
+    return formatters.render_batch(df, ops_type)
 
-def templater_text_output(well_name,df):
+def templater_text_output(well_name, df, value=None, height='250px', ops_type='df'):
     return html.Div(children=[
         dbc.Row(children=[
             dbc.Col(dcc.Markdown(f'#### **{well_name}** - Wellview Timelog Summary')),
@@ -54,10 +32,28 @@ def templater_text_output(well_name,df):
         ]),
         dcc.Textarea(
             id='tempalter_text_output',
-            value=wv_default_formatter(df),
+            value=wv_default_formatter(df, ops_type) if value is None else value,
             spellCheck=False,   
-            style={'width': '100%', 'height': '250px'},
+            style={'width': '100%', 'height': height},
         ),
     ],style={'margin-top': '25px'})
+
+def templater_batch_output(well_name, df, ops_type='df'):
+    table_cols = ['start_md', 'end_md', 'puw', 'sow', 'rtw', 'rop', 'wob', 'gpm', 'spp', 'rpm', 'tq', 'ecd']
+    df_table = df.assign(start=pd.to_datetime(df['start']).dt.strftime('%m/%d %H:%M'),
+                         end=pd.to_datetime(df['end']).dt.strftime('%m/%d %H:%M'))
+    return html.Div(children=[
+        templater_text_output(well_name, df, value=wv_batch_formatter(df, ops_type), height='500px'),
+        dag.AgGrid(
+            id='templater_batch_grid',
+            rowData=df_table.astype(object).where(df_table.notna(), None).to_dict('records'),
+            columnDefs=[{'field': 'start'}, {'field': 'end'}] +
+                       [{'field': col, 'valueFormatter': {'function': 'params.value == null ? "--" : d3.format(",.0f")(params.value)'}}
+                        for col in table_cols],
+            defaultColDef={'resizable': True, 'sortable': True, 'filter': False},
+            columnSize='sizeToFit',
+            style={'height': 300, 'width': '100%', 'margin-top': '10px'},
+        ),
+    ])
     
 # print(wv_default_formatter())
\ No newline at end of file
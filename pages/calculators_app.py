@@ -3,7 +3,7 @@ import time
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from utils import con_corva as cc
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -53,15 +53,13 @@ layout = dcc.Loading(
 
 # Callbacks ----------------------------------------------------------- 
 # # Calculators sidebar -----------------------------------------------
-@callback(
+# Flipped in the browser - assets/scripts.js
+clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggle_offcanvas'),
     Output("offcanvas-calculator-sidebar", "is_open"),
     Input("offcanvas_calculator_btn", "n_clicks"),
     State("offcanvas-calculator-sidebar", "is_open"),
 )
-def toggle_offcanvas(n1, is_open):
-    if n1:
-        return not is_open
-    return is_open
 
 # Calculators ---------------------------------------------------------
 @callback(
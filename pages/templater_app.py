@@ -3,7 +3,7 @@ from datetime import datetime
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from utils import con_corva as cc
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State, Patch
 import pandas as pd
 import numpy as np
 import plotly.express as px
@@ -11,10 +11,11 @@ import plotly.graph_objects as go
 import plotly.subplots as sp
 from dash import exceptions as e
 from comp.offcanvas import templater_sidebar #sidebar
-from comp.text_output import templater_text_output
+from comp.text_output import templater_text_output, templater_batch_output
 from dash.exceptions import PreventUpdate
-from utils.con_corva import get_telemetry_data_by_id_date_range
 from utils.helpers import * # see helpers for details
+from utils.datastore import dataset_store
+import uuid
 
 # --- Register pages ------------------------------------------------
 dash.register_page(
@@ -25,64 +26,73 @@ dash.register_page(
 )
 
 # --- Layout --------------------------------------------------------
-layout = dcc.Loading(
-    id='loading',
-    type='default',
-    color='#119DFF',
-    children=[ 
-        html.Div(children=[ 
-            templater_menu_btn(),
-            templater_sidebar(),
-            # dcc.Storage for storing data from the corva api 
-            dcc.Store(id='session_store', storage_type='session'),      # data store - df_wits - session
-            dcc.Store(id='well_name_store'),        # data store - well name id - session
-            dcc.Store(id='click_store'),            # data store - click data - session
-            dcc.Store(id='load_hours'),             # data store - load hours - session
-            dcc.Store(id='well_status_store'),      # data store - well status data - session
+def layout(**kwargs):
+    return html.Div(
+        children=[ 
+            html.Div(children=[ 
+                templater_menu_btn(),
+                templater_sidebar(),
+                # dcc.Storage for storing data from the corva api 
+                dcc.Store(id='session_id', data=uuid.uuid4().hex),           # data store - page session id - dataset quota
+                dcc.Store(id='session_store', storage_type='session'),      # data store - df_wits dataset key - session
+                dcc.Store(id='well_name_store'),        # data store - well name id - session
+                dcc.Store(id='click_store'),            # data store - click data - session
+                dcc.Store(id='load_hours'),             # data store - load hours - session
+                dcc.Store(id='well_status_store'),      # data store - well status data - session
+                dcc.Store(id='graph_width'),            # data store - grp_ops width in pixels - session
+                dcc.Interval(id='live_interval', interval=30 * 1000),   # live stand counter poll - 30 s
             
-            # --- Header name and Hr --------------------------------
-            html.H3(
-                children=[
-                    html.Img(src='https://img.icons8.com/3d-fluency/94/open-book--v1.png', 
-                            style={'height':'30px', 'margin-right':'10px'}),
-                    'Templater App',
-                ],
-            style={'margin-top': '-35px'}
-            ), 
-            html.Hr(),
+                # --- Header name and Hr --------------------------------
+                html.H3(
+                    children=[
+                        html.Img(src='https://img.icons8.com/3d-fluency/94/open-book--v1.png', 
+                                style={'height':'30px', 'margin-right':'10px'}),
+                        'Templater App',
+                    ],
+                style={'margin-top': '-35px'}
+                ), 
+                html.Hr(),
           
-            # --- Header graph section ------------------------------
-                dbc.Row([
-                        dbc.Col([
-                            html.P(id='grp_output',style={'textAlign': 'center','color': 'black','fontSize': 24,}),
-                            dcc.Graph(
-                                id='grp_ops', 
-                                selectedData=None, 
-                                style={'height': '200px'}
-                                )               
-                        ], style={'text-align': 'left', "marginRight": "10px"}, id="dummy-input", md=12)
-                    ]),
-                dbc.Row(html.Hr()),  
+                # --- Header graph section ------------------------------
+                    dbc.Row([
+                            dbc.Col([
+                                html.P(id='grp_output',style={'textAlign': 'center','color': 'black','fontSize': 24,}),
+                                html.P(id='live_stand', style={'textAlign': 'center', 'color': 'grey'}),
+                                dcc.Loading(
+                                    id='loading',
+                                    type='default',
+                                    color='#119DFF',
+                                    children=dcc.Graph(
+                                        id='grp_ops', 
+                                        selectedData=None, 
+                                        style={'height': '200px'}
+                                        )
+                                    )               
+                            ], style={'text-align': 'left', "marginRight": "10px"}, id="dummy-input", md=12)
+                        ]),
+                    dbc.Row(html.Hr()),  
             
-            # --- Lower output section ------------------------------
-                dbc.Row(children=[
+                # --- Lower output section ------------------------------
+                    dbc.Row(children=[
                     
-                    # --- Drilling timelog sumamry ------------------
-                    dbc.Col(children=[
-                        html.Div(id='hidden_text')   ,
-                        html.Div(id='templater_text_area')    
-                    ]),
+                        # --- Drilling timelog sumamry ------------------
+                        dbc.Col(children=[
+                            html.Div(id='hidden_text')   ,
+                            dbc.Progress(id='templater_progress', value=0, striped=True, animated=True,
+                                         style={'visibility': 'hidden'}),
+                            html.Div(id='templater_text_area')    
+                        ]),
                     
-                    # --- Drilling parameters sumamry -------------             
-                    dbc.Col(children=[
-                        # dcc.Markdown('''#### Parameter Summary''',style={'text-align':'center'}),
-                        html.Div(id='templater_parameter_area')    
-                    ]),
-                ])
+                        # --- Drilling parameters sumamry -------------             
+                        dbc.Col(children=[
+                            # dcc.Markdown('''#### Parameter Summary''',style={'text-align':'center'}),
+                            html.Div(id='templater_parameter_area')    
+                        ]),
+                    ])
 
             
-            ], style={'margin-right': '50px'})
-    ])
+                ], style={'margin-right': '50px'})
+        ])
 
 # --- Callbacks -----------------------------------------------------
 
@@ -125,8 +135,13 @@ def update_dropdown(dummy, status_id):
 @callback(
     Output('session_store', 'data'),
     [Input('well_name_store', 'data'),
-     Input('load_hours', 'data')],)
-def update_data(well_name_store, load_hours):
+     Input('load_hours', 'data')],
+    [State('session_id', 'data'),
+     State('graph_width', 'data')],
+    background=True,
+    running=[(Output('submit-button', 'disabled'), True, False)],
+    cancel=[Input('well_name_id', 'value')])
+def update_data(well_name_store, load_hours, session_id, graph_width):
 
     ctx = dash.callback_context
 
@@ -138,13 +153,14 @@ def update_data(well_name_store, load_hours):
 
     # Fetch data from Corva API and store in session
     asset_id = get_header_id_by_name(well_name=well_name_store)
-    df_wits = cc.get_telemetry_overview_data_by_id(int(asset_id), hrs=load_hours)
+    df_wits = cc.get_telemetry_overview_data_by_id(int(asset_id), hrs=load_hours,
+                                                   pixel_width=graph_width or cc.OVERVIEW_PIXELS)
 
     # Convert 'time_stamp' column to datetime if it's not already
     df_wits['time_stamp'] = pd.to_datetime(df_wits['time_stamp'])
 
-    # Return session_store data and None for the other stores to clear them
-    return df_wits.to_dict()
+    # Keep the frame server side - session_store only carries its key
+    return dataset_store.put(df_wits, session_id=session_id)
 
 # # Retrieve wits date range data -> Hidden   -----------------------
 @callback(
@@ -164,18 +180,35 @@ def update_data(name, click_data):
     if click_data is None or input_id != 'click_store':
         raise PreventUpdate
     
-    start_time = click_data["start"]
-    end_time = click_data["end"]
-    asset_id = get_header_id_by_name(name)
-    
-    df_wits = get_telemetry_data_by_id_date_range(asset_id, start_time, end_time)
-
-    df_wits_std_cntr = add_stand_counter_logic(df_wits)
-    df_wits_prepd = prep_df_wits_data(df_wits_std_cntr)
-
+    # The range itself is fetched by the text area's background job
     # Update the hidden_text children with name and click data
     return f'Name: {name}, Start Time: {click_data["start"]}, End Time: {click_data["end"]}'
 
+# # Graph width -> graph_width -------------------------------------
+# Measured in the browser on load, on submit and on resize (relayoutData
+# reports autosize) - OVERVIEW_PIXELS is only the fallback before that
+clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='graph_width'),
+    Output('graph_width', 'data'),
+    [Input('grp_ops', 'id'),
+     Input('submit-button', 'n_clicks'),
+     Input('grp_ops', 'relayoutData')])
+
+# # Live stand counter -> live_stand --------------------------------
+# Only the wits rows since the last tick go through the asset's StandCounter
+@callback(
+    Output('live_stand', 'children'),
+    Input('live_interval', 'n_intervals'),
+    State('well_name_store', 'data'),
+    prevent_initial_call=True)
+def update_live_stand(n_intervals, well_name_store):
+    if not well_name_store:
+        raise PreventUpdate
+    text = live_stand_text(well_name_store)
+    if text is None:
+        raise PreventUpdate
+    return text
+
 # # Store Query Callback -------------------------------------------
 @callback(
     [Output('well_name_store', 'data'),
@@ -196,11 +229,12 @@ def store_query_data(n_clicks, well_name_id, prev_hrs_id):
     [Output('grp_ops', 'figure'),
      Output('grp_output','children')],
     [Input('dummy-input', 'children'),
-     Input('click_store', 'data'), 
      Input('session_store', 'data'),
-     Input('well_name_store', 'data')],
-    [State('grp_ops', 'figure')])
-def update_graph(dummy, click_data, session_data, well_id, existing_figure):
+     Input('well_name_store', 'data'),
+     Input('grp_ops', 'relayoutData')],
+    [State('click_store', 'data'),
+     State('graph_width', 'data')])
+def update_graph(dummy, session_data, well_id, relayout_data, click_data, graph_width):
     temp_fig = go.Figure()
     temp_fig.update_layout(
             xaxis=dict(
@@ -220,6 +254,14 @@ def update_graph(dummy, click_data, session_data, well_id, existing_figure):
             margin=dict(l=20, r=20, t=5, b=5),
         )
         
+    # Zoom/pan only needs a redraw when the x axis moved (not for selections)
+    x_range = parse_relayout_range(relayout_data)
+    triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+    if triggered == ['grp_ops.relayoutData'] and x_range is None:
+        raise PreventUpdate
+    if x_range == 'reset':
+        x_range = None
+
     # Check if well_id is None
     if well_id is None:
         return temp_fig, ''
@@ -228,8 +270,17 @@ def update_graph(dummy, click_data, session_data, well_id, existing_figure):
     if session_data is None:
         return temp_fig, ''
 
-    # Load data from session_store
-    df = pd.DataFrame(session_data)
+    # Resolve the dataset key from session_store
+    df = dataset_store.get(session_data)
+    if df is None or df.empty:
+        return temp_fig, ''
+
+    # Get the latest datetime before decimating
+    time_max = np.max(df["time_stamp"])
+
+    # Decimate to the graph width - finer detail is fetched for a zoomed window
+    df = get_overview_plot_frame(df, get_header_id_by_name(well_name=well_id), x_range=x_range,
+                                 pixel_width=graph_width or cc.OVERVIEW_PIXELS)
     
     # Create figure
     fig = go.Figure()
@@ -246,42 +297,42 @@ def update_graph(dummy, click_data, session_data, well_id, existing_figure):
     df_state_drill_0 = df[df['state_drill'] == 0]
     df_state_drill_1 = df[df['state_drill'] == 1]
 
-   # All Block height trace
+   # All Block height trace - WebGL, arrays passed straight through
     fig.add_trace(
-        go.Scatter(
-            x=list(df.time_stamp),
-            y=list(df.block_height),
+        go.Scattergl(
+            x=df['time_stamp'],
+            y=df['block_height'].to_numpy(),
             mode='lines', 
             line=dict(color="rgba(125, 125, 125, 0.50)", width=4), 
             hovertemplate=hover_labels,
             name="Block Height",
-            customdata=df[['bit_depth', 'hole_depth']]
+            customdata=df[['bit_depth', 'hole_depth']].to_numpy()
         )
     )
 
     # Block height trace for off bottom
     fig.add_trace(
-        go.Scatter(
-            x=list(df_state_drill_0.time_stamp),
-            y=list(df_state_drill_0.block_height),
+        go.Scattergl(
+            x=df_state_drill_0['time_stamp'],
+            y=df_state_drill_0['block_height'].to_numpy(),
             mode='markers', 
             marker=dict(size=3, color="rgba(75, 75, 75, 0.0)"),  
             hovertemplate=hover_labels,
             name="Off Bottom",
-            customdata=df_state_drill_0[['bit_depth', 'hole_depth']]
+            customdata=df_state_drill_0[['bit_depth', 'hole_depth']].to_numpy()
         )
     )
 
     # Block height trace for on bottom
     fig.add_trace(
-        go.Scatter(
-            x=list(df_state_drill_1.time_stamp),
-            y=list(df_state_drill_1.block_height),
+        go.Scattergl(
+            x=df_state_drill_1['time_stamp'],
+            y=df_state_drill_1['block_height'].to_numpy(),
             mode='markers',
             marker=dict(size=3, color="rgba(24, 74, 223, 0.8)"),  
             hovertemplate=hover_labels,
             name="On Bottom",
-            customdata=df_state_drill_1[['bit_depth', 'hole_depth']]
+            customdata=df_state_drill_1[['bit_depth', 'hole_depth']].to_numpy()
         )
     )
 
@@ -305,35 +356,15 @@ def update_graph(dummy, click_data, session_data, well_id, existing_figure):
         height = 200,
         margin=dict(l=20, r=20, t=5, b=5),
         showlegend=True,
+        uirevision=well_id,     # keep the user's zoom when detail is swapped in
     )
     
-    if click_data is not None and 'start' in click_data and 'end' in click_data:
-        start = click_data['start']
-        end = click_data['end']
-        
-        fig.add_shape(
-            # Line Vertical
-            dict(
-                type="rect",
-                xref="x",
-                yref="paper",
-                x0=start,
-                y0=0,
-                x1=end,
-                y1=1,
-                fillcolor="LightSkyBlue",
-                opacity=0.25,
-                layer="below",
-                line_width=0,
-            )
-        )
+    # Redraw the current selection - later moves only patch the shape (see update_highlight)
+    fig.update_layout(shapes=selection_shapes(click_data))
     
-  # Get the latest datetime
-    time_max = np.max(df["time_stamp"])
-
-    # Ensure it's a datetime object
+    # Ensure it's a datetime object (tz-aware timestamps serialise with an offset)
     if isinstance(time_max, str):
-        time_max = datetime.strptime(time_max, "%Y-%m-%dT%H:%M:%S")
+        time_max = pd.to_datetime(time_max)
 
     # Format the datetime object
     formatted_time_max = time_max.strftime("%m/%d/%Y %H:%M")
@@ -344,67 +375,100 @@ def update_graph(dummy, click_data, session_data, well_id, existing_figure):
         
     return fig, well_label
 
-# # Store/clear selected data ---------------------------------------------
+# # Selection highlight -> Header Graph (partial update) ------------
+def selection_shapes(click_data):
+    if click_data is None or 'start' not in click_data or 'end' not in click_data:
+        return []
+    return [dict(
+        type="rect",
+        xref="x",
+        yref="paper",
+        x0=click_data['start'],
+        y0=0,
+        x1=click_data['end'],
+        y1=1,
+        fillcolor="LightSkyBlue",
+        opacity=0.25,
+        layer="below",
+        line=dict(width=0),
+    )]
+
 @callback(
+    Output('grp_ops', 'figure', allow_duplicate=True),
+    Input('click_store', 'data'),
+    prevent_initial_call=True)
+def update_highlight(click_data):
+    # Only the shapes list goes over the wire - traces and layout stay in the browser
+    patched_fig = Patch()
+    patched_fig['layout']['shapes'] = selection_shapes(click_data)
+    return patched_fig
+
+# # Store/clear selected data ---------------------------------------------
+# Copies selectedData's x range in the browser - assets/scripts.js
+clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='manage_store_data'),
     Output('click_store', 'data'),
     [Input('grp_ops', 'selectedData'),
      Input('well_name_id', 'value')])
-def manage_store_data(selected_data, dropdown_value):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return dash.no_update
-    input_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    if input_id == 'grp_ops':
-        if selected_data is not None and 'range' in selected_data:
-            range = selected_data['range']['x']
-            start = range[0]
-            end = range[1]
-            return {'start': start, 'end': end}
-        else:
-            return dash.no_update
-    elif input_id == 'well_name_id':
-        return None
 
 # # Templater Textarea ----------------------------------------------
+# Runs as a background job - the Corva pull reports progress and is
+# cancelled when the user picks another well
 @callback(
     Output('templater_text_area', 'children'),
     [Input('click_store', 'data'),
-     Input('well_name_store', 'data')])
-def update_text_area(click_data, well_name_store):
+     Input('well_name_store', 'data'),
+     Input('timelog_mode', 'value'),
+     Input('ops_type', 'value')],
+    background=True,
+    progress=[Output('templater_progress', 'value'),
+              Output('templater_progress', 'label')],
+    running=[(Output('templater_progress', 'style'), {'visibility': 'visible'}, {'visibility': 'hidden'})],
+    cancel=[Input('well_name_id', 'value')])
+def update_text_area(set_progress, click_data, well_name_store, timelog_mode, ops_type):
     ctx = dash.callback_context
-    df_str = pd.DataFrame()
+    df = pd.DataFrame()
     
     if not ctx.triggered:
         trigger_id = 'No clicks yet'
     else:
         trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
     
-    if trigger_id == 'click_store' and click_data is not None and 'end' in click_data:
+    if trigger_id in ('click_store', 'timelog_mode', 'ops_type') and click_data is not None and 'end' in click_data:
         start = click_data['start']
         end = click_data['end']
+        batch = timelog_mode in ('stand', 'tour')
         if well_name_store is not None:
-            asset_id = get_header_id_by_name(well_name_store)
-            df_str = get_telemetry_data_by_id_date_range(asset_id=asset_id, start=start,end=end)
-            df = prep_df_wits_data(df_str)
+            # Batch entries are summarised from the same cached pull as the single entry
+            progress = lambda percent, label: set_progress((percent, f'{label} {percent}%'))
+            if batch:
+                df = get_batch_timelog(well_name_store, start, end, intervals=timelog_mode, progress=progress)
+            else:
+                df = get_selection_result(well_name_store, start, end, progress=progress)['df_summary']
         
+        if df.empty:
+            return html.Div('No telemetry found for the selected range')
+        
+        if batch:
+            return html.Div([templater_batch_output(well_name=well_name_store, df=df, ops_type=ops_type)])
+
         return html.Div([
             templater_text_output(
                 well_name=well_name_store
                 , df=df
+                , ops_type=ops_type
                 )
         ])
     else:
         return html.Div('')  
 
 # # Templater sidebar -----------------------------------------------
-@callback(
+# Flipped in the browser - assets/scripts.js
+clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggle_offcanvas'),
     Output("offcanvas-templater-sidebar", "is_open"),
     Input("offcanvas_templater_btn", "n_clicks"),
-    State("offcanvas-templater-sidebar", "is_open"),)
-def toggle_offcanvas(n1, is_open):
-    if n1:
-        return not is_open
-    return is_open
+    State("offcanvas-templater-sidebar", "is_open"),
+)
 
 
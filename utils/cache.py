@@ -0,0 +1,100 @@
+import os
+import time
+import uuid
+import diskcache
+import psutil
+from flask_caching import Cache
+
+# Globals -----------------------------------------------------------
+# FileSystemCache works across gunicorn workers on one host; point CACHE_TYPE
+# at RedisCache (+ CACHE_REDIS_URL, needs the redis package) to share across hosts.
+CACHE_CONFIG = {
+    'CACHE_TYPE': os.getenv('CACHE_TYPE', 'FileSystemCache'),
+    'CACHE_DIR': os.getenv('CACHE_DIR', os.path.join('data', 'flask_cache')),
+    'CACHE_REDIS_URL': os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+    'CACHE_DEFAULT_TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', 15 * 60)),
+    'CACHE_THRESHOLD': int(os.getenv('CACHE_THRESHOLD', 500)),      # max files for FileSystemCache
+}
+LOCAL_STATE_DIR = os.getenv('LOCAL_STATE_DIR', os.path.join('data', 'local_state'))
+LOCK_EXPIRE = int(os.getenv('LOCK_EXPIRE', 600))    # seconds - frees a lock whose holder was killed
+FRAME_CACHE_DIR = os.getenv('FRAME_CACHE_DIR', os.path.join('data', 'frame_cache'))
+FRAME_CACHE_MB = int(os.getenv('FRAME_CACHE_MB', 1024))    # least recently used frames go past this
+
+# --- Shared cache --------------------------------------------------
+cache = Cache()
+
+def init_cache(server, config=None):
+    """Bind the shared cache to the Flask server - call once from app.py."""
+    cache.init_app(server, config={**CACHE_CONFIG, **(config or {})})
+    cache.app = server      # background threads (asset refresh) run outside a request
+    return cache
+
+def cache_get(key):
+    """Shared-cache lookup; None when no server is bound (scripts, benchmarks) or on any cache error."""
+    if cache.app is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        print(f"Cache error: {e}")
+        return None
+
+def cache_set(key, value, timeout=None):
+    if cache.app is None:
+        return
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        print(f"Cache error: {e}")
+
+# --- Cross-process state -------------------------------------------
+# Background callbacks run in forked job processes, so locks and bookkeeping
+# that must hold across jobs live in SQLite on disk, not in process memory.
+local_state = diskcache.Cache(LOCAL_STATE_DIR, eviction_policy='none')
+
+# Selection results carry whole telemetry frames - they get their own store,
+# bounded in bytes, so they cannot push the shared cache's small entries out.
+frame_cache = diskcache.Cache(FRAME_CACHE_DIR, size_limit=FRAME_CACHE_MB * 2**20,
+                              eviction_policy='least-recently-used')
+
+class ProcessLock:
+    """
+        Lock shared by every thread and process on this host, held as a
+        diskcache key recording the holder's pid. A lock whose holder has died
+        (a cancelled background job is terminated) is taken over at once, and
+        any lock lapses after `expire` seconds.
+    """
+    def __init__(self, name, expire=LOCK_EXPIRE, poll=0.05):
+        self.key = f'lock:{name}'
+        self.expire = expire
+        self.poll = poll
+        self._token = None
+
+    def acquire(self, blocking=True):
+        """Wait for the lock; with blocking=False return False at once while someone else holds it."""
+        token = (os.getpid(), uuid.uuid4().hex)
+        while not local_state.add(self.key, token, expire=self.expire, retry=True):
+            holder = local_state.get(self.key, retry=True)
+            if holder is not None and not psutil.pid_exists(holder[0]):
+                with local_state.transact(retry=True):
+                    if local_state.get(self.key) == holder:
+                        local_state.delete(self.key)
+                continue
+            if not blocking:
+                return False
+            time.sleep(self.poll)
+        self._token = token
+        return True
+
+    def release(self):
+        with local_state.transact(retry=True):
+            if local_state.get(self.key) == self._token:
+                local_state.delete(self.key)
+        self._token = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -6,9 +6,57 @@ import os
 from dotenv import load_dotenv
 import numpy as np
 import pytz
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from utils.wits import normalize_wits_records, add_asset_columns, concat_wits_pages, resample_wits
+from utils.wits_cache import WitsCache
+from utils.cache import cache_get, cache_set
 
 load_dotenv()  
 
+# Globals -----------------------------------------------------------
+BASE_URL = 'https://api.corva.ai/v1/data/corva/'
+HEADER_TTL = int(os.getenv('CORVA_HEADER_TTL', 900))    # seconds before the asset list is refreshed
+ASSETS_CACHE_KEY = 'corva:assets'
+MAX_FETCH_WORKERS = int(os.getenv('CORVA_MAX_WORKERS', 8))   # concurrent requests for multi-asset pulls
+MAX_RETRIES = int(os.getenv('CORVA_MAX_RETRIES', 4))
+PAGE_SIZE = int(os.getenv('CORVA_PAGE_SIZE', 3600))     # wits records per page - one hour at 1 Hz
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# (connect, read) timeouts in seconds per collection
+TIMEOUTS = {
+    'assets': (5, 30),
+    'wits': (5, 120),
+    'wits.summary-30s': (5, 60),
+    'wits.summary-1m': (5, 30),
+}
+DEFAULT_TIMEOUT = (5, 60)
+
+OVERVIEW_FIELDS ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, data.state"""
+OVERVIEW_PIXELS = int(os.getenv('OVERVIEW_PIXELS', 1200))   # header graph width until the browser reports it
+
+# Wits collections and their seconds per record, finest first
+COLLECTIONS = [('wits', 1), ('wits.summary-30s', 30), ('wits.summary-1m', 60)]
+# Bucket widths (seconds) the overview can be rolled up to locally
+ROLLUP_STEPS = [1, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600]
+
+def plan_overview_resolution(span_seconds, pixel_width=OVERVIEW_PIXELS) -> dict:
+    """
+        Pick the coarsest source collection and local rollup that still give
+        about one point per pixel for the requested span.
+        Input: time span in seconds, plot width in pixels
+        Output: {'collection', 'step', 'rule'} - step is the collection's
+        seconds per record, rule the local resample width
+    """
+    target = span_seconds / max(pixel_width, 1)
+    bucket = next((s for s in ROLLUP_STEPS if s >= target), ROLLUP_STEPS[-1])
+    collection, step = [c for c in COLLECTIONS if c[1] <= bucket][-1]
+
+    return {'collection': collection, 'step': step, 'rule': f'{bucket}S'}
+
 def convert_time_range_to_unix_timestamp(start, end, timezone="America/Anchorage", format="%Y-%m-%d %H:%M:%S.%f"):
     local_tz = pytz.timezone(timezone)
     
@@ -22,254 +70,531 @@ def convert_time_range_to_unix_timestamp(start, end, timezone="America/Anchorage
 
     return int(dt_start.timestamp()), int(dt_end.timestamp())  
 
-def get_header_data() -> pd.DataFrame():
-    url ='https://api.corva.ai/v1/data/corva/assets'
-    auth = {'Authorization': os.getenv('API_KEY')}
+# --- Corva client --------------------------------------------------
+def _record_key(rec):
+    """Identity of a wits record for de-duplicating page edges - its _id, or its content without one."""
+    return rec.get('_id') or json.dumps(rec, sort_keys=True, default=str)
 
-    params = {"sort": '{timestamp: 1}',
-            "query": "{county#eq#'Alaska'}",
-            "limit":"inf"
-            }
+class RetryableStatusError(requests.exceptions.HTTPError):
+    """Raised for 429/5xx responses so the retry loop can back off and try again."""
 
-    try:
-        r = requests.get(url, params=params, headers=auth)
-        result = json.loads(r.text)
-        df = pd.DataFrame.from_records(result)
-        df = df.loc[([True if i['name']=='Alaska' else False for i in df['program']])]
-        
-        # Clean df
-        search_items = ['(',')', 'delete','Benchmark']
-        c_df = df[~df['name'].apply(lambda x: any(item in x for item in search_items))]
-        c_df = c_df.sort_values('name', ascending=True)
+class CorvaClient:
+    """
+        Shared Corva API client. One pooled keep-alive session is reused by
+        every getter so TLS connections to api.corva.ai are not re-negotiated
+        per request; 429/5xx and connection errors are retried with jittered
+        exponential backoff.
+    """
+    def __init__(self, api_key=None, base_url=BASE_URL, pool_size=MAX_FETCH_WORKERS, max_retries=MAX_RETRIES):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.api_key = api_key or os.getenv('API_KEY')
+        self.session = self._new_session()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        if self.api_key:
+            session.headers['Authorization'] = self.api_key
+        return session
+
+    def reset_session(self):
+        """
+            Replace the pooled session without closing the old one - called in a
+            forked child (background callback job) so it opens its own sockets
+            instead of sharing the parent's TLS connections.
+        """
+        self.session = self._new_session()
+
+    def get(self, collection, params):
+        """
+            Input: collection name (e.g. 'wits', 'wits.summary-1m'), query params
+            Output: decoded json body
+        """
+        url = f'{self.base_url}{collection}'
+        timeout = TIMEOUTS.get(collection, DEFAULT_TIMEOUT)
         
-        return c_df
-    
-    except requests.exceptions.RequestException as e:
-        print(f"Error 1: {e}")
-        return pd.DataFrame()
+        retrying = Retrying(
+            retry=retry_if_exception_type((RetryableStatusError,
+                                           requests.exceptions.ConnectionError,
+                                           requests.exceptions.Timeout)),
+            wait=wait_random_exponential(multiplier=0.5, max=10),
+            stop=stop_after_attempt(self.max_retries),
+            reraise=True,
+        )
+        for attempt in retrying:
+            with attempt:
+                r = self.session.get(url, params=params, timeout=timeout)
+                if r.status_code in RETRY_STATUSES:
+                    raise RetryableStatusError(f'{r.status_code} from {collection}', response=r)
+                r.raise_for_status()
+                return r.json()
+
+    def fetch_header_data(self) -> pd.DataFrame():
+        params = {"sort": '{timestamp: 1}',
+                "query": "{county#eq#'Alaska'}",
+                "limit":"inf"
+                }
 
-    except json.JSONDecodeError as e:
-        print(f"Error 2: {e}")
-        return pd.DataFrame()
+        try:
+            result = self.get('assets', params)
+            df = pd.DataFrame.from_records(result)
+            df = df.loc[([True if i['name']=='Alaska' else False for i in df['program']])]
+            
+            # Clean df
+            search_items = ['(',')', 'delete','Benchmark']
+            c_df = df[~df['name'].apply(lambda x: any(item in x for item in search_items))]
+            c_df = c_df.sort_values('name', ascending=True)
+            
+            return c_df
+        
+        except requests.exceptions.RequestException as e:
+            print(f"Error 1: {e}")
+            return pd.DataFrame()
 
-    except Exception as e:
-        print(f"Error 3: {e}")
-        return pd.DataFrame()
-    
-def get_telemetry_data_by_list(assets) -> pd.DataFrame():
-    url = f'https://api.corva.ai/v1/data/corva/wits.summary-1m?'
-    auth = {'Authorization':os.getenv('API_KEY')}
-    telem_fields ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, 
-    data.hook_load, data.rotary_rpm, data.rotary_torque, 
-    data.pump_spm_1, data.pump_spm_2, data.pump_spm_total, data.standpipe_pressure, 
-    data.mud_flow_in, data.strks_total,data.gain_loss, 
-    data.mwd_annulus_ecd, data.mud_flow_out_percent, data.state
-    """
+        except json.JSONDecodeError as e:
+            print(f"Error 2: {e}")
+            return pd.DataFrame()
 
-    # Get active well asset ids
-    df_active_headers = get_header_data()
-    active_assets = df_active_headers['asset_id'].to_list()
-    active_well_name = df_active_headers['name'].to_list()
-    active_rig_name = df_active_headers['rig'].apply(lambda x: x['name']).to_list()
-    
-    # loop through assets and get last 24 hours of telemetry data
-    df_wits = pd.DataFrame()
-    for i, id in enumerate(assets):
-        params = {"asset_id": id,
-          "sort": '{timestamp: 1}',
-          "fields": telem_fields,
-          "limit":"1"
+        except Exception as e:
+            print(f"Error 3: {e}")
+            return pd.DataFrame()
+
+    def _fetch_asset_summary(self, asset_id, telem_fields) -> dict:
+        """Fetch the latest 1-minute summary row for one asset and time the round trip."""
+        params = {"asset_id": asset_id,
+            "sort": '{timestamp: -1}',      # newest first - limit 1 is the latest row
+            "fields": telem_fields,
+            "limit":"1"
         }
-
+        report = {'asset_id': asset_id, 'latency_s': np.nan, 'rows': 0, 'error': None}
+        df_wits_asset = None
+        
+        t0 = time.perf_counter()
         try:
             # Request corva data
-            r = requests.get(url, params=params, headers=auth)
-            js = r.json()
+            js = self.get('wits.summary-1m', params)
             
-            # Append a data to single df_wits
-            df_wits_asset = pd.DataFrame.from_records(js)  
-            df_wits_asset['timeStamp'] = df_wits_asset['timestamp'].apply(lambda x:datetime.fromtimestamp(x))
-            df_wits_asset = pd.concat([df_wits_asset[['timestamp','timeStamp']],pd.DataFrame.from_records(df_wits_asset['data'])],  axis=1)
+            df_wits_asset = normalize_wits_records(js)
             
             # Add asset info to each row
-            df_wits_asset['asset_id'] = active_assets[i]
-            df_wits_asset['well_name'] = active_well_name[i]
-            df_wits_asset['rig_name'] = active_rig_name[i]
+            asset = asset_registry.by_id(asset_id)
+            df_wits_asset['asset_id'] = asset['asset_id']
+            df_wits_asset['well_name'] = asset['name']
+            df_wits_asset['rig_name'] = asset['rig_name']
+            report['rows'] = len(df_wits_asset)
+
+        except requests.exceptions.RequestException as e:
+            report['error'] = f"Error 1: {e}"
+
+        except json.JSONDecodeError as e:
+            report['error'] = f"Error 2: {e}"
+
+        except Exception as e:
+            report['error'] = f"Error 3: {e}"
+        
+        finally:
+            report['latency_s'] = time.perf_counter() - t0
+            
+        return {'data': df_wits_asset if report['error'] is None else None, 'report': report}
+
+    def fetch_telemetry_for_assets(self, assets, max_workers=MAX_FETCH_WORKERS):
+        """
+            Input: list of asset ids, max concurrent requests
+            Output: (df_wits, df_report) - one frame for every asset built with a
+            single concat, and per-asset latency / row count / error
+        """
+        telem_fields ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, 
+        data.hook_load, data.rotary_rpm, data.rotary_torque, 
+        data.pump_spm_1, data.pump_spm_2, data.pump_spm_total, data.standpipe_pressure, 
+        data.mud_flow_in, data.strks_total,data.gain_loss, 
+        data.mwd_annulus_ecd, data.mud_flow_out_percent, data.state
+        """
+        
+        # Fan the requests out over a bounded pool sharing the client session
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(assets) or 1))) as pool:
+            results = list(pool.map(lambda id: self._fetch_asset_summary(id, telem_fields), assets))
+
+        frames = [res['data'] for res in results if res['data'] is not None]
+        df_wits = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        df_report = pd.DataFrame([res['report'] for res in results],
+                                 columns=['asset_id', 'latency_s', 'rows', 'error'])
+        
+        return df_wits, df_report
+
+    def get_telemetry_data_by_list(self, assets) -> pd.DataFrame():
+        df_wits, df_report = self.fetch_telemetry_for_assets(assets)
+        
+        for err in df_report['error'].dropna():
+            print(err)
+
+        return df_wits
+
+    def iter_wits_pages(self, asset_id, telem_fields, start_ts=None, end_ts=None, max_rows=None,
+                        descending=True, page_size=PAGE_SIZE, collection='wits'):
+        """
+            Keyset-paginated wits download. Each request is bounded by page_size
+            records and by the last timestamp of the previous page, and each page
+            is yielded as a flattened DataFrame as soon as it arrives.
+            Timestamps are not unique, so the cursor is inclusive (lte/gte) and
+            records already yielded at the cursor timestamp are dropped by _id.
+            Input: asset id, fields, optional unix start/end, optional row cap
+            Output: generator of DataFrames in the requested sort order
+        """
+        cursor = None
+        seen = set()        # keys of the records already yielded at the cursor timestamp
+        strict = False      # step past the cursor timestamp once it has been read in full
+        fetched = 0
+        
+        while True:
+            limit = page_size if max_rows is None else min(page_size, max_rows - fetched)
+            if limit <= 0:
+                return
+            
+            # Bound the page by the requested window and the previous page's cursor
+            bounds = []
+            if start_ts is not None:
+                bounds.append('{timestamp#gte#'+str(start_ts)+'}')
+            if end_ts is not None:
+                bounds.append('{timestamp#lte#'+str(end_ts)+'}')
+            if cursor is not None:
+                op = ('lt' if descending else 'gt') if strict else ('lte' if descending else 'gte')
+                bounds.append('{timestamp#'+op+'#'+str(cursor)+'}')
             
-            # Append to overall dataframe
-            df_wits = pd.concat([df_wits, df_wits_asset])  
+            params = {"asset_id": asset_id,
+                "sort": '{timestamp: -1}' if descending else '{timestamp: 1}',
+                "fields": '_id, ' + telem_fields,
+                "limit": str(limit),
+            }
+            if bounds:
+                params["query"] = 'AND'.join(bounds)
+
+            js = self.get(collection, params)
+            if not js:
+                return
+
+            fresh = [rec for rec in js if rec['timestamp'] != cursor or _record_key(rec) not in seen]
+            if fresh:
+                yield normalize_wits_records(fresh)
+            
+            fetched += len(fresh)
+            if len(js) < limit:
+                return
+            
+            last_ts = js[-1]['timestamp']
+            if last_ts != cursor:
+                cursor, strict = last_ts, False
+                seen = {_record_key(rec) for rec in js if rec['timestamp'] == last_ts}
+                continue
+
+            # A whole page on the cursor timestamp - take the rest of that second
+            # in one request, then step past it so the loop always advances
+            seen |= {_record_key(rec) for rec in fresh}
+            params["limit"] = 'inf'
+            params["query"] = 'AND'.join(bounds[:-1] + ['{timestamp#eq#'+str(cursor)+'}'])
+            rest = [rec for rec in self.get(collection, params) if _record_key(rec) not in seen]
+            if max_rows is not None:
+                rest = rest[:max_rows - fetched]
+            if rest:
+                yield normalize_wits_records(rest)
+            fetched += len(rest)
+            strict = True
+
+    def get_telemetry_data_by_id(self, asset_id) -> pd.DataFrame():
+        telem_fields ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, data.tvd, 
+        data.hook_load, data.rotary_rpm, data.rotary_torque, 
+        data.pump_spm_1, data.pump_spm_2, data.pump_spm_total, data.standpipe_pressure, 
+        data.mud_flow_in, data.strks_total, data.gain_loss, 
+        data.mwd_annulus_ecd, data.mud_flow_out_percent, data.state, data.rigtime
+        """
+        
+        df_wits = pd.DataFrame()
+        
+        try:
+            # Request corva data - latest 24 hours of 1 Hz records, one page at a time
+            pages = list(self.iter_wits_pages(asset_id, telem_fields, max_rows=86400))
+            df_wits = concat_wits_pages(pages)
+            
+            # Add asset, well, rig info to the dataframe
+            df_wits = add_asset_columns(df_wits, asset_registry.by_id(asset_id))
 
         except requests.exceptions.RequestException as e:
             print(f"Error 1: {e}")
-            continue
 
         except json.JSONDecodeError as e:
             print(f"Error 2: {e}")
-            continue
 
         except Exception as e:
             print(f"Error 3: {e}")
-            continue
 
-    # print(df_wits.columns)
-    return df_wits
+        return df_wits
 
-def get_telemetry_data_by_id(asset_id) -> pd.DataFrame():
-    url = f'https://api.corva.ai/v1/data/corva/wits?'
-    auth = {'Authorization':os.getenv('API_KEY')}
-    telem_fields ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, data.tvd, 
-    data.hook_load, data.rotary_rpm, data.rotary_torque, 
-    data.pump_spm_1, data.pump_spm_2, data.pump_spm_total, data.standpipe_pressure, 
-    data.mud_flow_in, data.strks_total, data.gain_loss, 
-    data.mwd_annulus_ecd, data.mud_flow_out_percent, data.state, data.rigtime
-    """
-    
-    df_wits = pd.DataFrame()
-    
-    # Get well asset ids
-    df_headers = get_header_data()
-   
-    params = {"asset_id": asset_id,
-        "sort": '{timestamp: -1}',
-        "fields": telem_fields,
-        "limit":"86400",
-    }
-
-    try:
-        # Request corva data
-        r = requests.get(url, params=params, headers=auth)
-        js = r.json()
+    def get_telemetry_overview_data_by_id(self, asset_id, hrs=3, use_cache=True, rule=None,
+                                          pixel_width=OVERVIEW_PIXELS) -> pd.DataFrame():
+        # Coarsest collection that still fills the graph - 24 hrs pulls ~1,440 one-minute rows, not 86,400
+        plan = plan_overview_resolution(hrs * 3600, pixel_width)
+        collection = plan['collection']
+        telem_fields = OVERVIEW_FIELDS
         
-        # Append a data to single df_wits
-        df_wits = pd.DataFrame.from_records(js)  
-        df_wits['time_stamp'] = df_wits['timestamp'].apply(lambda x:datetime.fromtimestamp(x))
-        df_wits = pd.concat([df_wits[['timestamp','time_stamp']], pd.DataFrame.from_records(df_wits['data'])], axis=1)
-        
-        # Add asset, well, rig info to the dataframe
-        df_wits['asset_id'] = str(asset_id)
-        df_wits['well_name'] = df_headers[df_headers['asset_id'] == asset_id]['name'].to_list()[0].split(' ')[0]
-        df_wits['rig_name'] = df_headers[df_headers['asset_id'] ==  asset_id]['rig'].apply(lambda x: x['name']).to_list()[0]
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error 1: {e}")
+        # Get df_wits
+        df_wits = pd.DataFrame()
+     
+        hrs_conv = 3600
 
-    except json.JSONDecodeError as e:
-        print(f"Error 2: {e}")
+        try:
+            # Request corva data - via the local cache only the new tail is downloaded
+            if use_cache:
+                df_wits = overview_caches[collection].get_window(asset_id, hrs)
+            else:
+                pages = list(self.iter_wits_pages(asset_id, telem_fields, max_rows=hrs * hrs_conv // plan['step'],
+                                                  collection=collection))
+                df_wits = concat_wits_pages(pages)
+            df_wits = self._prepare_overview(df_wits, asset_id, rule or plan['rule'])
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Error 1: {e}")
 
-    except Exception as e:
-        print(f"Error 3: {e}")
+        except json.JSONDecodeError as e:
+            print(f"Error 2: {e}")
 
-    return df_wits
+        except Exception as e:
+            print(f"Error 3: {e}")
 
-def get_telemetry_overview_data_by_id(asset_id, hrs=3) -> pd.DataFrame():
-    url = f'https://api.corva.ai/v1/data/corva/wits?'
-    # url = f'https://api.corva.ai/v1/data/corva/wits.summary-30s?'
-    # url = f'https://api.corva.ai/v1/data/corva/wits.summary-1m?'
-    auth = {'Authorization':os.getenv('API_KEY')}
-    telem_fields ="""timestamp, data.bit_depth, data.block_height, data.hole_depth, data.state"""
-    
-    # Get well asset ids and df_wits
-    df_wits = pd.DataFrame()
-    df_headers = get_header_data()
- 
-    hrs_conv = 3600
-    params = {"asset_id": asset_id,
-        "sort": '{timestamp: -1}',
-        "fields": telem_fields,
-        "limit":f"{hrs * hrs_conv}" 
-    }
-
-    try:
-        # Request corva data
-        r = requests.get(url, params=params, headers=auth)
-        js = r.json()
-
-        # Append a data to single df_wits
-        df_wits = pd.DataFrame.from_records(js)  
-        df_wits['time_stamp'] = df_wits['timestamp'].apply(lambda x:datetime.fromtimestamp(x))
-        df_wits = pd.concat([df_wits[['timestamp','time_stamp']], pd.DataFrame.from_records(df_wits['data'])], axis=1)
-        df_wits['state_drill'] = df_wits['state'].str.contains('Drilling', case=False).astype(int)
+        return df_wits
 
+    def _prepare_overview(self, df_wits, asset_id, rule) -> pd.DataFrame:
+        if df_wits.empty:
+            return df_wits
 
         # # Add asset, well, rig info to the dataframe
-        df_wits['asset_id'] = str(asset_id)
-        df_wits['well_name'] = df_headers[df_headers['asset_id'] == asset_id]['name'].to_list()[0].split(' ')[0]
-        df_wits['rig_name'] = df_headers[df_headers['asset_id'] ==  asset_id]['rig'].apply(lambda x: x['name']).to_list()[0]
-        
-        # Make sure the timestamp is a DateTimeIndex
-        df_wits.set_index('time_stamp', inplace=True)
+        df_wits = add_asset_columns(df_wits, asset_registry.by_id(asset_id))
+
+        # Resample - means for numeric channels, per-bucket mode for state
+        df_wits = resample_wits(df_wits, rule=rule)
+
+        # Flag from the bucket's mode state - averaging a 0/1 column gives fractions
+        df_wits['state_drill'] = df_wits['state'].astype(str).str.contains('Drilling', case=False).astype(int)
+        return df_wits
+
+    def get_telemetry_overview_range(self, asset_id, start_ts, end_ts,
+                                     pixel_width=OVERVIEW_PIXELS) -> pd.DataFrame():
+        """
+            Overview channels for a zoomed window at the level of detail its
+            span needs - a 20 minute zoom reads 1 Hz wits, a day one-minute
+            summaries. Served from the overview cache when it covers the window.
+            Input: asset id, unix start/end, plot width in pixels
+        """
+        plan = plan_overview_resolution(max(end_ts - start_ts, 1), pixel_width)
+        df_wits = pd.DataFrame()
+
+        try:
+            df_wits = overview_caches[plan['collection']].read_range(asset_id, start_ts, end_ts)
+            df_wits = self._prepare_overview(df_wits, asset_id, plan['rule'])
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error 1: {e}")
+
+        except json.JSONDecodeError as e:
+            print(f"Error 2: {e}")
+
+        except Exception as e:
+            print(f"Error 3: {e}")
+
+        return df_wits
+
+    def iter_telemetry_data_by_id_date_range(self, asset_id, start, end, page_size=PAGE_SIZE):
+        """
+            Streaming version of get_telemetry_data_by_id_date_range - yields
+            one prepared DataFrame per page so callers can start on the first
+            rows before the whole range has downloaded.
+        """
+        telem_fields ="""timestamp, data.bit_depth, data.block_height, 
+        data.hole_depth, data.hook_load, data.rotary_rpm, data.rotary_torque, 
+        data.tvd, data.pump_spm_total, data.standpipe_pressure, data.mud_flow_in, 
+        data.mud_flow_in, data.rop, data.weight_on_bit, data.mwd_annulus_ecd, 
+        data.mud_flow_out_percent, data.state, data.rigtime, data.mud_density
+        """
         
-        # Resample to 10-second intervals 
-        # todo: not sure if this is the best way to do this
-        df_wits = df_wits.resample('10S').agg(
-            {col: 'mean' if df_wits[col].dtype in ['float64', 'int64'] else lambda x: x.value_counts().index[0] for col in df_wits.columns})
-        df_wits = df_wits.reset_index()
+        # Format timestampes to unix int ranges
+        unix_start_ts, unix_end_ts = convert_time_range_to_unix_timestamp(start=start, end=end)
+        asset = asset_registry.by_id(asset_id)
         
-    except requests.exceptions.RequestException as e:
-        print(f"Error 1: {e}")
+        for df_wits in self.iter_wits_pages(asset_id, telem_fields, start_ts=unix_start_ts,
+                                            end_ts=unix_end_ts, page_size=page_size):
+            df_wits['state_drill'] = df_wits['state'].str.contains('Drilling', case=False).astype(int)
+            df_wits['bottom_status'] = np.where((df_wits['hole_depth'] - df_wits['bit_depth']) > 190, "off_bottom", "near_bottom")
+
+            # Add asset, well, rig info to the dataframe
+            df_wits = add_asset_columns(df_wits, asset)
+            
+            yield df_wits
 
-    except json.JSONDecodeError as e:
-        print(f"Error 2: {e}")
+    def get_telemetry_data_by_id_date_range(self, asset_id, start, end, progress=None) -> pd.DataFrame():
+        """
+            progress: optional callable(rows_done, rows_expected) called after
+            each page - rows_expected assumes one record per second
+        """
+        df_wits = pd.DataFrame()
 
-    except Exception as e:
-        print(f"Error 3: {e}")
+        try:
+            # Request corva data
+            unix_start_ts, unix_end_ts = convert_time_range_to_unix_timestamp(start=start, end=end)
+            rows_expected = max(unix_end_ts - unix_start_ts + 1, 1)
+            pages = []
+            for df_page in self.iter_telemetry_data_by_id_date_range(asset_id, start, end):
+                pages.append(df_page)
+                if progress is not None:
+                    progress(sum(map(len, pages)), rows_expected)
+            df_wits = concat_wits_pages(pages)
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Error 1: {e}")
 
-    return df_wits
+        except json.JSONDecodeError as e:
+            print(f"Error 2: {e}")
 
-def get_telemetry_data_by_id_date_range(asset_id, start, end) -> pd.DataFrame():
-    url = f'https://api.corva.ai/v1/data/corva/wits?'
-    auth = {'Authorization':os.getenv('API_KEY')}
-    telem_fields ="""timestamp, data.bit_depth, data.block_height, 
-    data.hole_depth, data.hook_load, data.rotary_rpm, data.rotary_torque, 
-    data.tvd, data.pump_spm_total, data.standpipe_pressure, data.mud_flow_in, 
-    data.mud_flow_in, data.rop, data.weight_on_bit, data.mwd_annulus_ecd, 
-    data.mud_flow_out_percent, data.state, data.rigtime, data.mud_density
+        except Exception as e:
+            print(f"Error 3: {e}")
+
+        return df_wits
+
+client = CorvaClient()
+overview_caches = {collection: WitsCache(client, OVERVIEW_FIELDS, collection=collection, step=step)
+                   for collection, step in COLLECTIONS}
+
+# --- Asset registry ------------------------------------------------
+class AssetRegistry:
     """
-    
-    df_wits = pd.DataFrame()
-    
-    # Get well asset ids
-    df_headers = get_header_data()
-    
-   # Format timestampes to unix int ranges
-    unix_start_ts, unix_end_ts = convert_time_range_to_unix_timestamp(start=start, end=end)
-    
-    params = {"asset_id": asset_id,
-        "sort": '{timestamp: -1}',
-        "fields": telem_fields,
-        "limit":"inf",
-        "query": '{timestamp#gte#'+str(unix_start_ts)+ '}AND{timestamp#lte#'+str(unix_end_ts)+'}'
-    }
-
-    try:
-        # Request corva data
-        r = requests.get(url, params=params, headers=auth)
-        js = r.json()
+        Process-wide cache of the Alaska asset headers.
+        The first call loads synchronously; once the TTL lapses the last good
+        copy keeps being served while a background thread refreshes it.
+    """
+    def __init__(self, loader=client.fetch_header_data, ttl=HEADER_TTL):
+        self.ttl = ttl
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._df = None
+        self._by_id = {}
+        self._by_name = {}
+        self._loaded_at = 0.0
+        self._refreshing = False
+
+    def _load(self):
+        # Shared across workers - only the first to find it stale asks Corva
+        df = cache_get(ASSETS_CACHE_KEY)
+        if df is None:
+            df = self._loader()
+            if not df.empty:
+                cache_set(ASSETS_CACHE_KEY, df, timeout=self.ttl)
         
-        # Append a data to single df_wits
-        df_wits = pd.DataFrame.from_records(js)  
-        df_wits['time_stamp'] = df_wits['timestamp'].apply(lambda x:datetime.fromtimestamp(x))
-        df_wits = pd.concat([df_wits[['timestamp','time_stamp']], pd.DataFrame.from_records(df_wits['data'])], axis=1)
-       
-        df_wits['state_drill'] = df_wits['state'].str.contains('Drilling', case=False).astype(int)
-        df_wits['bottom_status'] = np.where((df_wits['hole_depth'] - df_wits['bit_depth']) > 190, "off_bottom", "near_bottom")
-
-        # Add asset, well, rig info to the dataframe
-        df_wits['asset_id'] = str(asset_id)
-        df_wits['well_name'] = df_headers[df_headers['asset_id'] == asset_id]['name'].to_list()[0].split(' ')[0]
-        df_wits['rig_name'] = df_headers[df_headers['asset_id'] ==  asset_id]['rig'].apply(lambda x: x['name']).to_list()[0]
+        # Keep serving the last good copy if Corva is unreachable
+        if df.empty and self._df is not None:
+            return
         
-        # print(df_wits.columns)
-    except requests.exceptions.RequestException as e:
-        print(f"Error 1: {e}")
+        by_id, by_name = {}, {}
+        for rec in df.to_dict('records'):
+            rig = rec.get('rig')
+            info = {'asset_id': rec['asset_id'],
+                    'name': rec['name'],
+                    'well_name': rec['name'].split(' ')[0],
+                    'rig_name': rig.get('name') if isinstance(rig, dict) else None,
+                    'status': rec.get('status'),
+                    }
+            by_id[int(rec['asset_id'])] = info
+            by_name[rec['name']] = info
+
+        with self._lock:
+            self._df, self._by_id, self._by_name = df, by_id, by_name
+            self._loaded_at = time.monotonic()
+
+    def _after_fork(self):
+        # A forked job has no refresh thread and must not inherit held locks
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    def _background_refresh(self):
+        try:
+            self._load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _ensure_loaded(self):
+        if self._df is None or self._df.empty:
+            with self._load_lock:
+                if self._df is None or self._df.empty:
+                    self._load()
+            return
+
+        # Check-and-set under the lock so concurrent stale reads start one refresh
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._loaded_at <= self.ttl:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def refresh(self):
+        self._load()
+
+    def frame(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._df.copy()
+
+    def by_id(self, asset_id) -> dict:
+        self._ensure_loaded()
+        return self._by_id[int(asset_id)]
+
+    def by_name(self, name) -> dict:
+        self._ensure_loaded()
+        return self._by_name[name]
+
+asset_registry = AssetRegistry()
+
+def _after_fork_in_child():
+    client.reset_session()
+    asset_registry._after_fork()
+
+# Background callback jobs are forked from the server process (not on Windows, which spawns)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# --- Module-level getters (delegate to the shared client) ----------
+def fetch_header_data() -> pd.DataFrame():
+    return client.fetch_header_data()
+
+def get_header_data() -> pd.DataFrame():
+    return asset_registry.frame()
+
+def fetch_telemetry_for_assets(assets, max_workers=MAX_FETCH_WORKERS):
+    return client.fetch_telemetry_for_assets(assets, max_workers=max_workers)
+
+def get_telemetry_data_by_list(assets) -> pd.DataFrame():
+    return client.get_telemetry_data_by_list(assets)
+
+def get_telemetry_data_by_id(asset_id) -> pd.DataFrame():
+    return client.get_telemetry_data_by_id(asset_id)
+
+def get_telemetry_overview_data_by_id(asset_id, hrs=3, use_cache=True, rule=None,
+                                      pixel_width=OVERVIEW_PIXELS) -> pd.DataFrame():
+    return client.get_telemetry_overview_data_by_id(asset_id, hrs=hrs, use_cache=use_cache, rule=rule,
+                                                    pixel_width=pixel_width)
 
-    except json.JSONDecodeError as e:
-        print(f"Error 2: {e}")
+def get_telemetry_overview_range(asset_id, start_ts, end_ts, pixel_width=OVERVIEW_PIXELS) -> pd.DataFrame():
+    return client.get_telemetry_overview_range(asset_id, start_ts, end_ts, pixel_width=pixel_width)
 
-    except Exception as e:
-        print(f"Error 3: {e}")
+def get_telemetry_data_by_id_date_range(asset_id, start, end, progress=None) -> pd.DataFrame():
+    return client.get_telemetry_data_by_id_date_range(asset_id, start, end, progress=progress)
 
-    return df_wits
+def iter_telemetry_data_by_id_date_range(asset_id, start, end, page_size=PAGE_SIZE):
+    return client.iter_telemetry_data_by_id_date_range(asset_id, start, end, page_size=page_size)
 
 
 
@@ -0,0 +1,132 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+import pandas as pd
+from utils.cache import local_state
+
+# Globals -----------------------------------------------------------
+DATASET_DIR = os.getenv('DATASET_DIR', os.path.join('data', 'datasets'))
+MAX_MEMORY_MB = int(os.getenv('DATASET_MAX_MEMORY_MB', 512))
+MAX_PER_SESSION = int(os.getenv('DATASET_MAX_PER_SESSION', 4))
+MAX_DISK_ITEMS = int(os.getenv('DATASET_MAX_DISK_ITEMS', 200))
+SESSION_EXPIRE = int(os.getenv('DATASET_SESSION_EXPIRE', 24 * 3600))  # seconds an idle session's key list is kept
+
+# --- Server-side dataset store -------------------------------------
+class DatasetStore:
+    """
+        Keeps DataFrames on the server and hands out opaque keys, so a
+        dcc.Store only carries the key instead of the whole frame as JSON.
+        Frames are written to Parquet so any worker or background job can
+        resolve the key; the Parquet files are the source of truth. Each
+        process keeps a memory-bounded LRU of frames it has read on top.
+        Per-session quotas (newest MAX_PER_SESSION datasets) and disk pruning
+        are kept on disk too, so puts from forked callback jobs count.
+    """
+    def __init__(self, root=DATASET_DIR, max_memory_mb=MAX_MEMORY_MB,
+                 max_per_session=MAX_PER_SESSION, max_disk_items=MAX_DISK_ITEMS):
+        self.root = root
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self.max_per_session = max_per_session
+        self.max_disk_items = max_disk_items
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()    # key -> (df, nbytes), oldest first
+        self._nbytes = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, f'{key}.parquet')
+
+    def _drop(self, key):
+        nbytes = self._frames.pop(key, (None, 0))[1]
+        self._nbytes -= nbytes
+
+    def _remove_file(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _expire_session(self, key, session_id):
+        """Record key against the session; returns the keys pushed out of its quota."""
+        if session_id is None:
+            return []
+        session_key = f'datasets:session:{session_id}'
+        with local_state.transact():
+            keys = local_state.get(session_key, []) + [key]
+            cut = max(len(keys) - self.max_per_session, 0)
+            local_state.set(session_key, keys[cut:], expire=SESSION_EXPIRE)
+        return keys[:cut]
+
+    def _prune_disk(self):
+        # Least recently used first - get() touches a file's mtime on every hit
+        files = [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith('.parquet')]
+        if len(files) <= self.max_disk_items:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_items]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def put(self, df, session_id=None) -> str:
+        """Store df and return its key. The caller must not mutate df afterwards."""
+        key = uuid.uuid4().hex
+        nbytes = int(df.memory_usage(deep=True).sum())
+
+        os.makedirs(self.root, exist_ok=True)
+        df.to_parquet(self._path(key), index=False)
+
+        # Per-session quota - forget the session's oldest datasets
+        expired = self._expire_session(key, session_id)
+
+        with self._lock:
+            self._frames[key] = (df, nbytes)
+            self._nbytes += nbytes
+            for old_key in expired:
+                self._drop(old_key)
+
+            # Memory bound - evict least recently used (they stay on disk)
+            while self._nbytes > self.max_bytes and len(self._frames) > 1:
+                self._drop(next(iter(self._frames)))
+
+        for old_key in expired:
+            self._remove_file(old_key)
+        self._prune_disk()
+
+        return key
+
+    def get(self, key):
+        """Resolve a key to a copy of its DataFrame (callers may mutate it), or None if it has expired."""
+        if not key:
+            return None
+
+        # The file decides - another process may have expired the key
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._drop(key)
+            return None
+
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key][0].copy()
+
+        try:
+            df = pd.read_parquet(self._path(key))
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key][0].copy()
+            nbytes = int(df.memory_usage(deep=True).sum())
+            self._frames[key] = (df, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes and len(self._frames) > 1:
+                self._drop(next(iter(self._frames)))
+        return df.copy()
+
+dataset_store = DatasetStore()
@@ -1,26 +1,21 @@
 from utils import con_corva as cc
+from utils.stands import add_stand_numbers, StandCounter
+from utils.summary import summarize_interval, summarize_intervals, summarize_stands, tour_intervals
+from utils.cache import frame_cache, local_state, ProcessLock
+from utils.wits import LOCAL_TZ, concat_wits_pages, decimate_wits
 from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
 import plotly.express as px
 import numpy as np
 import pandas as pd
+import threading
+from collections import OrderedDict
 
 # --- Helper functions ----------------------------------------------
 def get_header_id_by_name(well_name):
-    ASSET = ''
-    
-    # Get header df
-    df = cc.get_header_data()
-    
-    # Clean df
-    search_items = ['(',')', 'delete','Benchmark']
-    c_df = df[~df['name'].apply(lambda x: any(item in x for item in search_items))]
-
-    #Search df
-    ASSET = c_df[c_df['name'] == well_name]['asset_id'].to_list()[0]
-    
-    return ASSET 
+    # Served from the cached asset registry - no Corva round trip
+    return cc.asset_registry.by_name(well_name)['asset_id']
 
 def home_menu_btn(): 
     return html.Button(id='offcanvas_home_btn',n_clicks=0,
@@ -48,82 +43,212 @@ def get_timelog_summary_data(df, start, end):
     return str(df.to_dict())
 
 def prep_df_wits_data(df_wits):
-    df_out = pd.DataFrame()
-    
-    # filter to only drilling on bottom data
-    df_wits_on_btm = df_wits[df_wits['state_drill'] == 1].copy()
-    df_wits_off_btm = df_wits[df_wits['state_drill'] == 0].copy()
-
-    if df_wits is None:
-        return df_out
-    
-    start_md = np.round(np.min(df_wits_on_btm['hole_depth']),0)
-    end_md = np.round(np.max(df_wits_on_btm['hole_depth']),0)
-    end_tvd = '--' #np.round(np.max(df_wits_on_btm['tvd']),0)
-    
-    # TODO:Need to get from T&D info
-    puw = '--' #np.round(np.max(df_wits['hookload']),0)
-    sow = '--' #np.round(np.max(df_wits['hookload']),0)
-    rtw = '--' #np.round(np.max(df_wits['hookload']),0)
-    
-    rop = np.round(np.average(df_wits_on_btm['rop']),0)
-    wob = np.round(np.average(df_wits_on_btm['weight_on_bit']),2)
-    
-    gpm = np.round(np.average(df_wits_on_btm['mud_flow_in']),0)
-    spp = np.round(np.average(df_wits_on_btm['standpipe_pressure']),0)
-    fout = np.round(np.average(df_wits_on_btm['mud_flow_out_percent']),0)
-    rpm = np.round(np.average(df_wits_on_btm['rotary_rpm']),0)
-    tq = np.round(np.average(df_wits_on_btm['rotary_torque']),1)
-    
-    mw = np.round(np.average(df_wits_on_btm['mwd_annulus_ecd']),2)
-    ecd = np.round(np.average(df_wits_on_btm['mwd_annulus_ecd']),2)
-    
-    df_out = pd.DataFrame([
-        {'start_md': str(start_md),
-         'end_md': str(end_md),
-         'end_tvd': str(end_tvd),
-         'puw': str(puw),
-         "sow": str(sow),
-         'rtw': str(rtw),
-         'rop': str(rop),
-         'wob': str(wob),
-         'gpm': str(gpm),
-         'spp': str(spp),
-         'fout': str(fout),
-         'rpm': str(rpm),
-         'tq': str(tq),
-         'mw':str(mw),
-         'ecd': str(ecd),
-        }
-    ])
-    print(df_out.reset_index(drop=True))
-    return df_out.reset_index(drop=True)
+    """
+        Timelog summary for the selected interval - one groupby pass in utils.summary.
+        Output: one-row df of floats (start_md ... ecd, NaN where unavailable)
+    """
+    if df_wits is None or df_wits.empty:
+        return pd.DataFrame()
+    return pd.DataFrame([summarize_interval(df_wits)])
     
 def add_stand_counter_logic(df_wits):
-    df_orig = df_wits.copy()
-    df_out = pd.DataFrame()
+    # Connection/stand detection lives in utils.stands - one vectorized pass
+    df_out, _ = add_stand_numbers(df_wits)
+    return df_out
 
-    df_orig['bh_deriv'] = df_orig['block_height'].diff()
+def update_live_stands(asset_id, hrs=3):
+    """
+        Feed the wits rows that arrived since the last poll to the asset's
+        incremental StandCounter - called by the templater's live_interval timer.
+        Rows come from the shared 1 Hz WitsCache, which only downloads its new
+        tail, and the counter is kept in local_state, so every worker and job
+        continues one count. A counter more than `hrs` behind is reseeded
+        from the cached window.
+        Output: the updated StandCounter, None when another poll of the asset
+        is still running or Corva has no data
+    """
+    key = f'stand_counter:{asset_id}'
+    lock = ProcessLock(key)
+    if not lock.acquire(blocking=False):
+        return None     # skip this tick rather than queue behind the running one
+    try:
+        wits_cache = cc.overview_caches['wits']
+        state = wits_cache.sync(asset_id, hrs)
+        if state is None:
+            return None
 
-    df = df_orig[df_orig['bottom_status'] == "near_bottom"]
+        window = int(hrs * 3600)
+        counter = local_state.get(key, retry=True)
+        if counter is None or counter.last_ts is None or counter.last_ts < state['last_ts'] - window:
+            counter, start_ts = StandCounter(), state['last_ts'] - window + 1
+        else:
+            start_ts = int(counter.last_ts) + 1
+        counter.update(wits_cache.read(asset_id, start_ts, state['last_ts']))
 
-    # Assume 'time_stamp' is the datetime index
-    df.set_index('time_stamp', inplace=True)
+        # Dropped once idle for a window - it would be reseeded by then anyway
+        local_state.set(key, counter, expire=window, retry=True)
+        return counter
+    finally:
+        lock.release()
 
-    # Resample to 15-minute windows and get max value
-    df_resampled = df['bh_deriv'].resample('30S').max()
-    threshold = df_resampled.std() * 7.5
-    df_resampled = df_resampled.reset_index()
-    df_resampled.columns = ['time_stamp', 'bh_deriv']
-    df_resampled['threshold'] = threshold
-    df_resampled['is_Conn'] = df_resampled['bh_deriv'].where(df_resampled['bh_deriv'] > threshold)
+def live_stand_text(well_name):
+    """
+        Input: well name from well_name_store
+        Output: stands counted live for an active well, '' for any other
+        well, None when there is nothing new to show
+    """
+    well = cc.asset_registry.by_name(well_name)
+    if well['status'] != 'active':
+        return ''
+    counter = update_live_stands(well['asset_id'])
+    if counter is None or counter.last_ts is None:
+        return None
+    first, last = (pd.Timestamp(ts, unit='s', tz='UTC').tz_convert(LOCAL_TZ) for ts in (counter.first_ts, counter.last_ts))
+    return f'Live: stand {counter.std_num} since {first:%m/%d %H:%M}, last data {last:%H:%M}'
 
-    df_resampled = df_resampled[df_resampled['is_Conn'].notna()]
-    df_resampled['std_num'] = df_resampled.reset_index().index +1
+# --- Header graph level of detail ---------------------------------
+def parse_relayout_range(relayout_data):
+    """
+        Input: grp_ops relayoutData
+        Output: (start, end) tz-aware timestamps for a zoom/pan, 'reset' for
+        autorange, None when the x axis did not change
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get('xaxis.autorange'):
+        return 'reset'
+    x_range = relayout_data.get('xaxis.range')
+    if x_range is None and 'xaxis.range[0]' in relayout_data:
+        x_range = [relayout_data['xaxis.range[0]'], relayout_data.get('xaxis.range[1]')]
+    if not x_range or None in x_range:
+        return None
+    # Plotly reports the axis in rig wall-clock time
+    return tuple(pd.Timestamp(x).tz_localize(LOCAL_TZ) for x in x_range)
 
-    df_conns = df_resampled[['bh_deriv','std_num']]
+def get_overview_plot_frame(df_overview, asset_id, x_range=None, pixel_width=cc.OVERVIEW_PIXELS) -> pd.DataFrame:
+    """
+        Rows to plot on grp_ops, bounded by the graph width whatever the span:
+        the stored overview outside the visible window and, when zoomed in,
+        finer detail for the window itself, M4-decimated per on/off bottom.
+        Input: overview df from the dataset store, asset id, visible (start, end)
+        Output: time-ordered rows, at most ~8 points per pixel plus the overview
+    """
+    if df_overview.empty or x_range is None:
+        return decimate_wits(df_overview, pixel_width)
 
-    df_out = df_orig.merge(df_conns, left_on='bh_deriv', right_on='bh_deriv', how='left')
-    df_out['std_num'] = df_out['std_num'].fillna(method='ffill').fillna(0).astype(int)
-    
-    return df_out
\ No newline at end of file
+    start, end = x_range
+    df_detail = cc.get_telemetry_overview_range(int(asset_id), int(start.timestamp()), int(end.timestamp()),
+                                                pixel_width=pixel_width)
+    if df_detail.empty:
+        return decimate_wits(df_overview, pixel_width)
+
+    outside = (df_overview['time_stamp'] < start) | (df_overview['time_stamp'] > end)
+    df_plot = concat_wits_pages([df_overview[outside].copy(),
+                                 decimate_wits(df_detail, pixel_width, t_range=(start, end)).copy()])
+    return df_plot.sort_values('time_stamp', ignore_index=True)
+
+# --- Selection pipeline --------------------------------------------
+class SelectionCache:
+    """
+        Memoises selection results by (asset_id, start, end). Callbacks that
+        fire on the same selection share one computation - later callers, in
+        this process or another background job, wait on a lock on disk for
+        the in-flight one instead of repeating the Corva query. Results are
+        put in the size-bounded frame_cache so other workers and jobs on this
+        host can reuse them.
+    """
+    def __init__(self, maxsize=32, shared_timeout=15 * 60, shareable=None):
+        self.maxsize = maxsize
+        self.shared_timeout = shared_timeout
+        self.shareable = shareable      # result -> bool, e.g. skip empty (failed) pulls
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        shared_key = f'selection:{":".join(map(str, key))}'
+        result = frame_cache.get(shared_key, retry=True)
+        if result is None:
+            with ProcessLock(shared_key):
+                # Whoever held the lock may have just computed it
+                result = frame_cache.get(shared_key, retry=True)
+                if result is None:
+                    result = compute()
+                    if self.shareable is None or self.shareable(result):
+                        frame_cache.set(shared_key, result, expire=self.shared_timeout, retry=True)
+        self._remember(key, result)
+        return result
+
+selection_cache = SelectionCache(shareable=lambda result: not result['df_stands'].empty)
+
+def _build_selection_result(asset_id, start, end, progress=None) -> dict:
+    # Download is reported as 0-90%, stands and summaries as the rest
+    fetch_progress = None
+    if progress is not None:
+        fetch_progress = lambda done, expected: progress(min(90 * done // expected, 90), 'Downloading telemetry')
+    df_wits = cc.get_telemetry_data_by_id_date_range(asset_id, start, end, progress=fetch_progress)
+    if progress is not None:
+        progress(90, 'Summarising')
+    df_stands = pd.DataFrame()
+    df_stand_intervals = pd.DataFrame()
+    df_summary = pd.DataFrame()
+    df_stand_summary = pd.DataFrame()
+
+    if not df_wits.empty:
+        df_stands, df_stand_intervals = add_stand_numbers(df_wits)
+        df_summary = prep_df_wits_data(df_stands)
+        df_stand_summary = summarize_stands(df_stands)
+
+    # df_stands is df_wits plus bh_deriv/std_num - the raw pull is not kept twice
+    return {'asset_id': asset_id,
+            'df_stands': df_stands,
+            'df_stand_intervals': df_stand_intervals,
+            'df_summary': df_summary,
+            'df_stand_summary': df_stand_summary,
+            }
+
+def get_selection_result(well_name, start, end, progress=None) -> dict:
+    """
+        Input: well name, the selected start/end from click_store and an
+        optional progress(percent, label) callback
+        Output: dict of df_stands (the telemetry with std_num), df_stand_intervals, df_summary
+        and df_stand_summary (per-stand stats),
+        fetched once per selection and shared by every callback
+    """
+    asset_id = get_header_id_by_name(well_name)
+    return selection_cache.get_or_compute(
+        (int(asset_id), start, end), lambda: _build_selection_result(asset_id, start, end, progress))
+
+def get_batch_timelog(well_name, start, end, intervals='tour', tour_hours=6, progress=None) -> pd.DataFrame:
+    """
+        Timelog entries for many intervals inside one selection, summarised from
+        the selection's single cached telemetry pull.
+        Input: well name, selected start/end, intervals - 'stand', 'tour' or a
+        list of {'start', 'end'} (naive times are local rig time)
+        Output: one row per interval - start, end, rows and the timelog fields
+        (std_num too for stands)
+    """
+    result = get_selection_result(well_name, start, end, progress=progress)
+    df_stands = result['df_stands']
+
+    if isinstance(intervals, str) and intervals == 'stand':
+        df_intervals = result['df_stand_intervals']
+        if df_intervals.empty:
+            return pd.DataFrame()
+        df_batch = summarize_intervals(df_stands, df_intervals[['start', 'end']])
+        df_batch.insert(0, 'std_num', df_intervals['std_num'].to_numpy())
+        return df_batch
+
+    if isinstance(intervals, str) and intervals == 'tour':
+        intervals = tour_intervals(start, end, hours=tour_hours)
+    return summarize_intervals(df_stands, intervals)
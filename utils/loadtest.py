@@ -0,0 +1,73 @@
+import argparse
+import statistics
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# Globals -----------------------------------------------------------
+DEFAULT_URL = 'http://127.0.0.1:8050'
+DEFAULT_PAGES = ['/', '/templater_app', '/calculators_app', '/analysis_app', '/template_page']
+
+# --- Page visit ----------------------------------------------------
+def _page_content_payload(path):
+    # The request dash.page_container makes to render a page's layout
+    return {'output': '.._pages_content.children..._pages_store.data..',
+            'outputs': [{'id': '_pages_content', 'property': 'children'},
+                        {'id': '_pages_store', 'property': 'data'}],
+            'inputs': [{'id': '_pages_location', 'property': 'pathname', 'value': path},
+                       {'id': '_pages_location', 'property': 'search', 'value': ''}],
+            'changedPropIds': ['_pages_location.pathname'],
+            'state': []}
+
+_sessions = threading.local()
+
+def _session():
+    if not hasattr(_sessions, 'session'):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+def visit(base_url, path, timeout=60):
+    """One page load - the index HTML plus the page-content callback. Returns (ok, seconds)."""
+    start_time = time.perf_counter()
+    try:
+        ok = _session().get(base_url + path, timeout=timeout).ok
+        ok &= _session().post(base_url + '/_dash-update-component', json=_page_content_payload(path),
+                              timeout=timeout).ok
+    except requests.exceptions.RequestException:
+        ok = False
+    return ok, time.perf_counter() - start_time
+
+def load_test(base_url, path, requests_per_page=200, concurrency=16) -> dict:
+    """
+        Hit one page with `concurrency` simultaneous clients.
+        Output: {'path', 'rps', 'p50_ms', 'p95_ms', 'errors'} - rps counts page
+        loads (2 HTTP requests each)
+    """
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: visit(base_url, path), range(requests_per_page)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = sorted(seconds for _, seconds in results)
+    return {'path': path,
+            'rps': requests_per_page / elapsed,
+            'p50_ms': statistics.median(latencies) * 1e3,
+            'p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1e3,
+            'errors': sum(not ok for ok, _ in results)}
+
+# --- Load test -----------------------------------------------------
+if __name__ == '__main__':
+    # Start the server first, e.g. gunicorn wsgi:server --workers 4 --threads 4 --bind 127.0.0.1:8050
+    parser = argparse.ArgumentParser(description='Page loads per second against a running WSC dash server')
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES)
+    parser.add_argument('--requests', type=int, default=200, help='page loads per page')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f'{"page":<20} {"loads/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"errors":>7}')
+    for path in args.pages:
+        result = load_test(args.url, path, args.requests, args.concurrency)
+        print(f'{result["path"]:<20} {result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} '
+              f'{result["p95_ms"]:>8.1f} {result["errors"]:>7}')
@@ -0,0 +1,76 @@
+from collections import deque
+from dash._callback import GLOBAL_CALLBACK_LIST
+
+# --- Callback graph ------------------------------------------------
+def _output_props(output):
+    """'a.b' or multi-output '..a.b...c.d..' -> ['a.b', 'c.d'] (allow_duplicate hashes stripped)."""
+    props = output.strip('.').split('...') if output.startswith('..') else [output]
+    return [prop.split('@')[0] for prop in props]
+
+def callback_graph(callbacks=None) -> list:
+    """
+        Registered callbacks as {inputs, outputs, clientside} with props as
+        'component_id.property' strings.
+        Input: callback specs, default every @callback / clientside_callback registered so far
+    """
+    callbacks = GLOBAL_CALLBACK_LIST if callbacks is None else callbacks
+    return [{'inputs': [f"{i['id']}.{i['property']}" for i in cb['inputs']],
+             'outputs': _output_props(cb['output']),
+             'clientside': cb.get('clientside_function') is not None}
+            for cb in callbacks]
+
+def round_trips(trigger, graph) -> dict:
+    """
+        Callbacks one interaction sets off, following chains through outputs
+        that feed other callbacks. Every server callback reached is one HTTP
+        request to Flask; clientside ones run in the browser. This is an upper
+        bound - a callback that raises PreventUpdate stops its chain early.
+        Input: the changed prop ('grp_ops.selectedData'), callback_graph()
+        Output: {'server': n, 'clientside': n}
+    """
+    counts = {'server': 0, 'clientside': 0}
+    fired = set()
+    queue = deque([trigger])
+    seen = {trigger}
+    while queue:
+        prop = queue.popleft()
+        for idx, cb in enumerate(graph):
+            if idx in fired or prop not in cb['inputs']:
+                continue
+            fired.add(idx)
+            counts['clientside' if cb['clientside'] else 'server'] += 1
+            for out in cb['outputs']:
+                if out not in seen:
+                    seen.add(out)
+                    queue.append(out)
+    return counts
+
+def user_interactions(graph) -> list:
+    """Inputs no callback writes to - the props a user changes directly."""
+    outputs = {out for cb in graph for out in cb['outputs']}
+    return sorted({prop for cb in graph for prop in cb['inputs'] if prop not in outputs})
+
+
+# --- Harness -------------------------------------------------------
+# Interactions that are pure UI state and must not reach the server
+UI_ONLY = ['offcanvas_home_btn.n_clicks', 'offcanvas_calculator_btn.n_clicks',
+           'offcanvas_xxx_btn.n_clicks', 'offcanvas_templater_btn.n_clicks']
+
+if __name__ == '__main__':
+    import sys
+    import app  # registers app.py and every page's callbacks
+
+    graph = callback_graph()
+    print(f'{"interaction":<40} {"server":>6} {"clientside":>10}')
+    for prop in user_interactions(graph):
+        counts = round_trips(prop, graph)
+        print(f'{prop:<40} {counts["server"]:>6} {counts["clientside"]:>10}')
+
+    # grp_ops selection: click_store is filled in the browser, only the consumers hit the server
+    selection = round_trips('grp_ops.selectedData', graph)
+    print(f'\nbox select on grp_ops: {selection["server"]} server request(s), '
+          f'{selection["clientside"]} clientside')
+
+    leaks = [prop for prop in UI_ONLY if round_trips(prop, graph)['server']]
+    if leaks:
+        sys.exit(f'server round trips for UI-only interactions: {", ".join(leaks)}')
@@ -0,0 +1,357 @@
+import numpy as np
+import pandas as pd
+import time
+from utils.wits import LOCAL_TZ
+
+# Globals -----------------------------------------------------------
+# summary name: (wits channel, decimals shown in the timelog)
+CHANNELS = {
+    'hole_depth': ('hole_depth', 0),
+    'tvd': ('tvd', 0),
+    'hook_load': ('hook_load', 0),
+    'rop': ('rop', 0),
+    'wob': ('weight_on_bit', 2),
+    'gpm': ('mud_flow_in', 0),
+    'spp': ('standpipe_pressure', 0),
+    'fout': ('mud_flow_out_percent', 0),
+    'rpm': ('rotary_rpm', 0),
+    'tq': ('rotary_torque', 1),
+    'mw': ('mud_density', 2),
+    'ecd': ('mwd_annulus_ecd', 2),
+}
+STATS = ['min', 'mean', 'max', 'median']   # median is reported as p50
+
+MOVE_RATE = 0.1         # ft/s - block travelling faster than this is moving the string
+ROTATING_RPM = 10.0     # rpm - string turning faster than this is rotating
+WEIGHT_STATES = {'puw': 'pickup', 'sow': 'slackoff', 'rtw': 'rotating'}
+TIMELOG_PARAMS = ['rop', 'wob', 'gpm', 'spp', 'fout', 'rpm', 'tq', 'mw', 'ecd']    # on-bottom means
+SUMMARY_FIELDS = ['start_md', 'end_md', 'end_tvd', *WEIGHT_STATES, *TIMELOG_PARAMS, 'slide_pct']
+
+# --- Activity ------------------------------------------------------
+def _state_contains(state, pattern) -> np.ndarray:
+    """Case-insensitive match on the state channel, tested once per category when categorical."""
+    if isinstance(state.dtype, pd.CategoricalDtype):
+        matches = state.cat.categories.astype(str).str.contains(pattern, case=False)
+        codes = state.cat.codes.to_numpy()
+        return np.append(matches, False)[codes]      # code -1 (missing) -> False
+    return state.astype(str).str.contains(pattern, case=False).to_numpy()
+
+def _bottom_split(activity) -> pd.Categorical:
+    return pd.Categorical.from_codes((activity.codes != 0).astype('int8'), categories=['on', 'off'])
+
+def classify_activity(df, time_col='time_stamp') -> pd.Categorical:
+    """
+        Label each row for hook-load weights and the on/off bottom split:
+        on_bottom (drilling), pickup / slackoff (string moving up / down without
+        rotation), rotating (turning with the block still), in_slips or other.
+        Input: df with state_drill, block_height, rotary_rpm and state when present
+        Output: Categorical aligned with df's rows
+    """
+    categories = ['on_bottom', 'pickup', 'slackoff', 'rotating', 'in_slips', 'other']
+    n = len(df)
+    codes = np.full(n, categories.index('other'), dtype='int8')
+    if n == 0:
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    on_bottom = df['state_drill'].to_numpy() == 1 if 'state_drill' in df else np.zeros(n, dtype=bool)
+    in_slips = _state_contains(df['state'], 'slips') if 'state' in df else np.zeros(n, dtype=bool)
+
+    if 'block_height' in df:
+        # Block velocity in time order, scattered back to the frame's row order
+        t = df[time_col].values.astype('datetime64[ns]').astype('int64') / 1e9
+        order = np.argsort(t, kind='stable')
+        bh = df['block_height'].to_numpy(dtype='float64')[order]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.diff(bh) / np.diff(t[order])
+        velocity = np.empty(n)
+        velocity[order] = np.concatenate(([np.nan], rate))
+    else:
+        velocity = np.full(n, np.nan)
+
+    rpm = df['rotary_rpm'].to_numpy(dtype='float64') if 'rotary_rpm' in df else np.zeros(n)
+    rotating = rpm > ROTATING_RPM
+    free = ~on_bottom & ~in_slips
+
+    codes[free & ~rotating & (velocity > MOVE_RATE)] = categories.index('pickup')
+    codes[free & ~rotating & (velocity < -MOVE_RATE)] = categories.index('slackoff')
+    codes[free & rotating & (np.abs(velocity) <= MOVE_RATE)] = categories.index('rotating')
+    codes[in_slips & ~on_bottom] = categories.index('in_slips')
+    codes[on_bottom] = categories.index('on_bottom')
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+# --- Summaries -----------------------------------------------------
+def summarize_channels(df, keys) -> pd.DataFrame:
+    """
+        min/mean/max/p50 of every summary channel the frame has, for each
+        group of keys, in one groupby pass.
+        Input: df, list of grouping columns or arrays
+        Output: one row per group, columns (summary name, stat)
+    """
+    channels = {name: col for name, (col, _) in CHANNELS.items() if col in df}
+    if df.empty or not channels:
+        return pd.DataFrame()
+
+    df_values = df[list(channels.values())].astype('float64')
+    df_values.columns = list(channels)
+    groups = df_values.groupby(keys, observed=True, sort=True)
+
+    # One cythonized reduction per stat over all channels, rather than agg's per-column loop
+    names = ['p50' if how == 'median' else how for how in STATS]
+    df_stats = pd.concat({name: getattr(groups, how)() for name, how in zip(names, STATS)}, axis=1)
+    return df_stats.swaplevel(axis=1)[[(channel, name) for channel in channels for name in names]]
+
+def _group_order(codes):
+    """Row order that groups codes together - None when they already are (one interval, batch ids)."""
+    return None if np.all(codes[1:] >= codes[:-1]) else np.argsort(codes, kind='stable')
+
+def _grouped_stats(values, codes, n_groups):
+    """
+        Per-group nan-aware min, mean and max of every channel in one pass -
+        three reduceat calls over a (channels x rows) array, no loop over channels.
+        Input: (channels x rows) float64 array, group code (0..n_groups-1) per row
+        Output: (min, mean, max), each (n_groups x channels), NaN for empty groups
+    """
+    shape = (n_groups, values.shape[0])
+    mins, means, maxs = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    if values.shape[1] == 0:
+        return mins, means, maxs
+
+    order = _group_order(codes)
+    if order is not None:
+        values, codes = values[:, order], codes[order]
+    present = np.flatnonzero(np.diff(codes, prepend=-1))
+    groups = codes[present]
+
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means[groups] = (np.add.reduceat(np.where(valid, values, 0.0), present, axis=1)
+                         / np.add.reduceat(valid, present, axis=1)).T
+    mins[groups] = np.fmin.reduceat(values, present, axis=1).T     # fmin/fmax skip NaN
+    maxs[groups] = np.fmax.reduceat(values, present, axis=1).T
+    return mins, means, maxs
+
+def _grouped_median(values, codes, n_groups) -> np.ndarray:
+    """Per-group nan-aware median of a 1-D array via one lexsort; NaN for empty groups."""
+    keep = ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    order = np.lexsort((values, codes))
+    values, codes = values[order], codes[order]
+
+    lo = np.searchsorted(codes, np.arange(n_groups), side='left')
+    counts = np.searchsorted(codes, np.arange(n_groups), side='right') - lo
+    medians = np.full(n_groups, np.nan)
+    has = counts > 0
+    medians[has] = (values[lo[has] + (counts[has] - 1) // 2] + values[lo[has] + counts[has] // 2]) / 2
+    return medians
+
+def _hookload_medians(hook_load, activity, codes, n_groups) -> np.ndarray:
+    """(n_groups x 3) median hook load per group while picking up, slacking off and rotating."""
+    states = [activity.categories.get_loc(state) for state in WEIGHT_STATES.values()]
+    state_idx = np.full(len(activity.categories) + 1, -1)     # code -1 (missing) -> no state
+    state_idx[states] = np.arange(len(states))
+    row_state = state_idx[np.asarray(activity.codes)]
+    rows = row_state >= 0
+    medians = _grouped_median(hook_load[rows], codes[rows] * len(states) + row_state[rows],
+                              n_groups * len(states))
+    return medians.reshape(n_groups, len(states))
+
+def hookload_weights(df, activity, by=None) -> pd.DataFrame:
+    """
+        PUW / SOW / RTW as the median hook load while picking up, slacking off
+        and rotating off bottom.
+        Input: df with hook_load, activity from classify_activity, optional
+        group labels aligned with df's rows (e.g. std_num)
+        Output: puw, sow, rtw columns - one row, or one per group label
+    """
+    columns = list(WEIGHT_STATES)
+    if 'hook_load' not in df or df.empty:
+        return pd.DataFrame(columns=columns)
+
+    if by is None:
+        groups, codes = None, np.zeros(len(df), dtype='int64')
+    else:
+        groups, codes = np.unique(np.asarray(by), return_inverse=True)
+    medians = _hookload_medians(df['hook_load'].to_numpy(dtype='float64'), activity, codes,
+                                1 if groups is None else len(groups))
+    return pd.DataFrame(medians, columns=columns, index=groups)
+
+def timelog_table(df_wits, by, activity=None) -> pd.DataFrame:
+    """
+        Timelog numbers for every group in one pass - depths from on-bottom
+        rows, drilling parameters as on-bottom means and PUW/SOW/RTW from
+        hook load, rounded to the CHANNELS decimals.
+        Input: df_wits, group labels aligned with its rows, optional precomputed
+        classify_activity labels
+        Output: one row of floats per group (NaN where the channel or state is missing)
+    """
+    by = np.asarray(by)
+    if len(by) and np.all(by == by[0]):
+        groups, codes = by[:1], np.zeros(len(by), dtype='int64')     # one interval - skip the sort
+    else:
+        groups, codes = np.unique(by, return_inverse=True)
+    groups = pd.Index(groups)
+    activity = classify_activity(df_wits) if activity is None else activity
+    on_bottom = np.asarray(activity.codes == activity.categories.get_loc('on_bottom'))
+    df_out = pd.DataFrame(np.nan, index=groups, columns=SUMMARY_FIELDS)
+
+    # Only the stats the timelog shows - on-bottom rows, every channel at once
+    names = [name for name in ('hole_depth', 'tvd', *TIMELOG_PARAMS) if CHANNELS[name][0] in df_wits]
+    if names:
+        rows = np.flatnonzero(on_bottom)
+        values = np.empty((len(names), len(rows)))
+        for i, name in enumerate(names):
+            values[i] = df_wits[CHANNELS[name][0]].to_numpy()[rows]
+        mins, means, maxs = _grouped_stats(values, codes[rows], len(groups))
+        for i, name in enumerate(names):
+            decimals = CHANNELS[name][1]
+            if name == 'hole_depth':
+                df_out['start_md'] = np.round(mins[:, i], decimals)
+                df_out['end_md'] = np.round(maxs[:, i], decimals)
+            elif name == 'tvd':
+                df_out['end_tvd'] = np.round(maxs[:, i], decimals)
+            else:
+                df_out[name] = np.round(means[:, i], decimals)
+
+    if 'hook_load' in df_wits:
+        weights = _hookload_medians(df_wits['hook_load'].to_numpy(dtype='float64'), activity, codes, len(groups))
+        df_out[list(WEIGHT_STATES)] = np.round(weights, CHANNELS['hook_load'][1])
+
+    # Share of on-bottom time spent sliding (mud motor runs)
+    if 'state' in df_wits:
+        sliding = on_bottom & _state_contains(df_wits['state'], 'slide')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slide_pct = 100 * np.bincount(codes, weights=sliding, minlength=len(groups)) \
+                / np.bincount(codes, weights=on_bottom, minlength=len(groups))
+        df_out['slide_pct'] = np.round(slide_pct, 0)
+    return df_out
+
+def summarize_interval(df_wits) -> dict:
+    """
+        Timelog numbers for one interval (see timelog_table).
+        Output: dict of floats (NaN where the channel or state is missing)
+    """
+    if df_wits.empty:
+        return dict.fromkeys(SUMMARY_FIELDS, np.nan)
+    df_out = timelog_table(df_wits, np.zeros(len(df_wits), dtype='int8'))
+    return {name: float(value) for name, value in df_out.iloc[0].items()}
+
+def summarize_stands(df_stands) -> pd.DataFrame:
+    """
+        Per-stand statistics split by on/off bottom, plus PUW/SOW/RTW.
+        Input: df with std_num (see utils.stands.add_stand_numbers)
+        Output: one row per stand, flat columns like rop_on_mean, hook_load_off_p50, puw
+    """
+    if df_stands.empty or 'std_num' not in df_stands:
+        return pd.DataFrame()
+
+    std_num = df_stands['std_num'].to_numpy()
+    activity = classify_activity(df_stands)
+    df_stats = summarize_channels(df_stands, [std_num, _bottom_split(activity)])
+    df_stats = df_stats.unstack(-1)
+    df_stats.columns = [f'{name}_{side}_{how}' for name, how, side in df_stats.columns]
+    df_stats.index.name = 'std_num'
+
+    weights = hookload_weights(df_stands, activity, by=std_num)
+    return df_stats.join(weights).reset_index()
+
+# --- Batch timelogs ------------------------------------------------
+def _to_seconds(values, tz=LOCAL_TZ) -> np.ndarray:
+    """Unix seconds from datetimes or strings; naive values are local rig time."""
+    times = pd.DatetimeIndex([pd.Timestamp(value) for value in values])
+    if times.tz is None:
+        times = times.tz_localize(tz)
+    return times.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').astype('int64') / 1e9
+
+def tour_intervals(start, end, hours=6, tz=LOCAL_TZ) -> pd.DataFrame:
+    """
+        Split [start, end] into rig tours aligned to the local clock
+        (00:00, 06:00 ... for 6 hour tours), clipped to the range.
+        Output: start/end columns, tz-aware - no empty tour when end is on a boundary
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    start = start.tz_localize(tz) if start.tz is None else start.tz_convert(tz)
+    end = end.tz_localize(tz) if end.tz is None else end.tz_convert(tz)
+
+    edges = pd.date_range(start.floor(f'{hours}h'), end, freq=f'{hours}h')[1:]
+    starts = [start, *edges]
+    ends = [*edges, end]
+    df_tours = pd.DataFrame({'start': starts, 'end': ends})
+    return df_tours[df_tours['start'] < df_tours['end']].reset_index(drop=True)
+
+def summarize_intervals(df_wits, intervals, time_col='time_stamp') -> pd.DataFrame:
+    """
+        Timelog numbers for many intervals from one telemetry pull - rows are
+        assigned to intervals with searchsorted and summarised in one groupby.
+        Intervals may overlap; rows outside every interval are ignored.
+        Input: df_wits, intervals as a df or list of dicts with start/end
+        (datetimes or strings, naive = local rig time)
+        Output: one row per interval - start, end, rows and the timelog fields
+    """
+    df_intervals = pd.DataFrame(intervals, columns=['start', 'end']).reset_index(drop=True)
+    if df_intervals.empty:
+        return pd.DataFrame(columns=['start', 'end', 'rows', *SUMMARY_FIELDS])
+
+    starts = _to_seconds(df_intervals['start'])
+    ends = _to_seconds(df_intervals['end'])
+    t = df_wits[time_col].values.astype('datetime64[ns]').astype('int64') / 1e9 if not df_wits.empty \
+        else np.array([])
+    order = np.argsort(t, kind='stable')
+    t_sorted = t[order]
+
+    # Row slices per interval, expanded without a python loop (overlaps repeat rows)
+    lo = np.searchsorted(t_sorted, starts, side='left')
+    hi = np.searchsorted(t_sorted, ends, side='right')
+    counts = np.maximum(hi - lo, 0)
+    interval_id = np.repeat(np.arange(len(df_intervals)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = order[np.repeat(lo, counts) + offsets]
+
+    df_out = df_intervals.copy()
+    df_out['rows'] = counts
+    if len(rows):
+        # Activity needs block velocity, so label the continuous pull before slicing it
+        activity = classify_activity(df_wits)[rows]
+        df_table = timelog_table(df_wits.iloc[rows].reset_index(drop=True), interval_id, activity=activity)
+        df_out = df_out.join(df_table)
+    return df_out.reindex(columns=['start', 'end', 'rows', *SUMMARY_FIELDS])
+
+
+# --- Benchmark -----------------------------------------------------
+def _legacy_summary(df_wits):
+    df_wits_on_btm = df_wits[df_wits['state_drill'] == 1].copy()
+    df_wits_off_btm = df_wits[df_wits['state_drill'] == 0].copy()
+    out = {'start_md': str(np.round(np.min(df_wits_on_btm['hole_depth']), 0)),
+           'end_md': str(np.round(np.max(df_wits_on_btm['hole_depth']), 0))}
+    for name, (col, decimals) in CHANNELS.items():
+        if col in df_wits:
+            out[name] = str(np.round(np.average(df_wits_on_btm[col]), decimals))
+    return out
+
+if __name__ == '__main__':
+    from utils.stands import add_stand_numbers
+    from utils.wits import add_asset_columns, normalize_wits_records, _synthetic_records
+
+    df_day = add_asset_columns(normalize_wits_records(_synthetic_records()),
+                               {'asset_id': 1, 'well_name': '1C-157', 'rig_name': 'Doyon 142'})
+    df_day['state_drill'] = df_day['state'].str.contains('Drilling', case=False).astype(int)
+    df_day, _ = add_stand_numbers(df_day)
+
+    for label, func in (('legacy prep_df_wits_data', _legacy_summary),
+                        ('summarize_interval', summarize_interval),
+                        ('summarize_stands', summarize_stands)):
+        start_time = time.perf_counter()
+        result = func(df_day)
+        print(f'{label:>26}: {time.perf_counter() - start_time:.3f}s')
+    print(summarize_interval(df_day))
+
+    # Batch - 96 quarter-hour entries from one pull vs one summary per click
+    edges = pd.date_range(df_day['time_stamp'].min(), periods=97, freq='15min')
+    intervals = pd.DataFrame({'start': edges[:-1], 'end': edges[1:]})
+    start_time = time.perf_counter()
+    for row in intervals.itertuples():
+        summarize_interval(df_day[(df_day['time_stamp'] >= row.start) & (df_day['time_stamp'] <= row.end)])
+    loop_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    summarize_intervals(df_day, intervals)
+    print(f'{len(intervals)} intervals: per-interval loop {loop_time:.3f}s, '
+          f'summarize_intervals {time.perf_counter() - start_time:.3f}s')
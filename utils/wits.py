@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from operator import itemgetter
+import time
+
+# Globals -----------------------------------------------------------
+LOCAL_TZ = 'America/Anchorage'
+RESAMPLE_RULE = '10S'
+# Kept float64 - cumulative counters pass 2**24 (where float32 steps by whole units) and
+# depths are differenced row to row, so float32 rounding would swamp their diffs
+WIDE_CHANNELS = frozenset({'rigtime', 'strks_total', 'hole_depth', 'bit_depth', 'tvd'})
+
+# --- Normalisation -------------------------------------------------
+def normalize_wits_records(js, tz=LOCAL_TZ, float_dtype='float32') -> pd.DataFrame:
+    """
+        Flatten a list of wits records ({timestamp, data: {...}}) into a typed
+        columnar frame in one pass.
+        Input: decoded json records, output timezone, dtype for numeric channels
+        Output: DataFrame with timestamp (unix), time_stamp (tz-aware) and one
+        column per data channel - numeric channels as float_dtype (WIDE_CHANNELS
+        as float64), text as category
+    """
+    if not js:
+        return pd.DataFrame(columns=['timestamp', 'time_stamp'])
+
+    timestamps = np.array([rec['timestamp'] for rec in js])
+    data = [rec.get('data') or {} for rec in js]
+
+    # Channel names in first-seen order, including any only present on later records
+    keys = list(data[0])
+    extra = set().union(*map(dict.keys, data)).difference(keys)
+    keys.extend(sorted(extra))
+
+    columns = {
+        'timestamp': timestamps,
+        'time_stamp': pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(tz),
+    }
+    for key in keys:
+        sample = next((d[key] for d in data if d.get(key) is not None), None)
+
+        if isinstance(sample, str):
+            columns[key] = pd.Categorical([d.get(key) for d in data])
+        elif isinstance(sample, (int, float)) and not isinstance(sample, bool):
+            dtype = 'float64' if key in WIDE_CHANNELS else float_dtype
+            try:
+                # Fast path - channel present and non-null on every record
+                columns[key] = np.fromiter(map(itemgetter(key), data), dtype=dtype, count=len(data))
+            except (KeyError, TypeError):
+                columns[key] = np.array([d.get(key) for d in data], dtype=dtype)   # None -> nan
+        else:
+            columns[key] = [d.get(key) for d in data]
+
+    return pd.DataFrame(columns)
+
+def add_asset_columns(df_wits, asset) -> pd.DataFrame:
+    """Tag every row with the registry's asset id, well and rig as constant categoricals."""
+    n = len(df_wits)
+    for col, value in (('asset_id', str(asset['asset_id'])),
+                       ('well_name', asset['well_name']),
+                       ('rig_name', asset['rig_name'])):
+        df_wits[col] = pd.Categorical.from_codes(np.zeros(n, dtype='int8'), categories=[value])
+    return df_wits
+
+def concat_wits_pages(pages) -> pd.DataFrame:
+    """Concat pages once, unifying categories so text channels stay categorical."""
+    pages = [page for page in pages if not page.empty]
+    if not pages:
+        return pd.DataFrame()
+
+    for col in pages[0].columns:
+        if not isinstance(pages[0][col].dtype, pd.CategoricalDtype):
+            continue
+        categories = pd.Index([])
+        for page in pages:
+            if col in page and isinstance(page[col].dtype, pd.CategoricalDtype):
+                categories = categories.append(page[col].cat.categories.difference(categories))
+        for page in pages:
+            if col in page:
+                page[col] = page[col].astype(pd.CategoricalDtype(categories))
+
+    return pd.concat(pages, ignore_index=True)
+
+# --- Resampling ----------------------------------------------------
+def _bucket_mode(idx, codes, n_buckets, n_categories):
+    """Most frequent code per bucket (-1 for empty buckets) via one bincount."""
+    valid = codes >= 0
+    table = np.bincount(idx[valid] * n_categories + codes[valid],
+                        minlength=n_buckets * n_categories).reshape(n_buckets, n_categories)
+    return np.where(table.any(axis=1), table.argmax(axis=1), -1)
+
+def resample_wits(df, rule=RESAMPLE_RULE, time_col='time_stamp') -> pd.DataFrame:
+    """
+        Resample wits to fixed-width buckets: numeric channels are averaged and
+        text/categorical channels take the per-bucket mode. Every bucket between
+        the first and last record is returned, empty ones as NaN, like
+        DataFrame.resample.
+        Input: df with a datetime column, bucket width (e.g. '10S', '1min')
+        Output: resampled df with time_col as the first column
+    """
+    if df.empty:
+        return df
+
+    width = pd.Timedelta(rule).value
+    ns = df[time_col].values.astype('datetime64[ns]').astype('int64')   # utc for tz-aware
+    buckets = ns // width
+    first = buckets.min()
+    idx = buckets - first
+    n_buckets = int(idx.max()) + 1
+
+    bucket_ns = (first + np.arange(n_buckets)) * width
+    time_index = pd.to_datetime(bucket_ns, unit='ns', utc=True)
+    tz = getattr(df[time_col].dtype, 'tz', None)
+    time_index = time_index.tz_convert(tz) if tz is not None else time_index.tz_localize(None)
+
+    out = {time_col: time_index}
+    for col in df.columns:
+        if col == time_col:
+            continue
+        series = df[col]
+
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+            present = ~np.isnan(values)
+            sums = np.bincount(idx, weights=np.where(present, values, 0.0), minlength=n_buckets)
+            counts = np.bincount(idx, weights=present, minlength=n_buckets)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums / counts
+            out[col] = means.astype(series.dtype) if pd.api.types.is_float_dtype(series) else means
+            continue
+
+        cat = series.array if isinstance(series.dtype, pd.CategoricalDtype) else pd.Categorical(series)
+        codes = np.asarray(cat.codes, dtype='int64')
+        categories = cat.categories
+
+        if len(categories) <= 1 or (codes == codes[0]).all():
+            # Constant column (well_name, rig_name, asset_id ...) - no mode needed
+            occupied = np.bincount(idx, minlength=n_buckets) > 0
+            mode = np.where(occupied, codes[0], -1)
+        else:
+            mode = _bucket_mode(idx, codes, n_buckets, len(categories))
+        out[col] = pd.Categorical.from_codes(mode, categories=categories)
+
+    return pd.DataFrame(out)
+
+# --- Decimation ----------------------------------------------------
+def m4_indices(t, y, n_bins, groups=None, t_range=None) -> np.ndarray:
+    """
+        Row indices that preserve a line's shape at n_bins pixels: the first,
+        last, min and max sample of every pixel bin (M4, the min/max flavour
+        of LTTB), per group when given.
+        Input: t and y arrays, bin count, optional int group labels (e.g.
+        state_drill), optional (t0, t1) to bin over - rows outside are dropped
+        Output: sorted unique row indices, at most 4 * n_bins per group
+    """
+    t = np.asarray(t, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    t0, t1 = (np.nanmin(t), np.nanmax(t)) if t_range is None else t_range
+    keep = np.flatnonzero((t >= t0) & (t <= t1) & ~np.isnan(y))
+    if len(keep) <= 4 * n_bins:
+        return keep
+
+    width = (t1 - t0) / n_bins or 1.0
+    bins = np.minimum(((t[keep] - t0) // width).astype('int64'), n_bins - 1)
+    if groups is not None:
+        bins = bins * (int(np.max(groups)) + 1) + np.asarray(groups)[keep]
+
+    picks = []
+    for key in (t[keep], y[keep]):
+        order = np.lexsort((key, bins))                 # by bin, then key ascending
+        edges = np.flatnonzero(np.diff(bins[order])) + 1
+        picks.append(order[np.concatenate(([0], edges))])           # first / min
+        picks.append(order[np.concatenate((edges - 1, [len(order) - 1]))])  # last / max
+    return keep[np.unique(np.concatenate(picks))]
+
+def decimate_wits(df, n_bins, value_col='block_height', time_col='time_stamp', group_col='state_drill',
+                  t_range=None) -> pd.DataFrame:
+    """
+        M4-decimate a wits frame for plotting - see m4_indices.
+        Input: df, pixel bins, plotted column, datetime column, group column
+        (kept per group if present), optional (start, end) timestamps
+        Output: the selected rows in time order
+    """
+    if df.empty:
+        return df
+    t = df[time_col].values.astype('datetime64[ns]').astype('int64') / 1e9
+    if t_range is not None:
+        t_range = tuple(pd.Timestamp(v).value / 1e9 for v in t_range)
+    groups = df[group_col].to_numpy(dtype='int64') if group_col in df else None
+    idx = m4_indices(t, df[value_col].to_numpy(dtype='float64'), n_bins, groups=groups, t_range=t_range)
+    return df.iloc[idx[np.argsort(t[idx], kind='stable')]]
+
+
+# --- Benchmark -----------------------------------------------------
+def _legacy_records_to_frame(js) -> pd.DataFrame:
+    df_wits = pd.DataFrame.from_records(js)
+    df_wits['time_stamp'] = df_wits['timestamp'].apply(lambda x:datetime.fromtimestamp(x))
+    return pd.concat([df_wits[['timestamp','time_stamp']], pd.DataFrame.from_records(df_wits['data'])], axis=1)
+
+def _synthetic_records(n=86400, start=1688000000):
+    rng = np.random.default_rng(0)
+    states = ['Rotary Drilling', 'Slide Drilling', 'In Slips', 'Static Off Bottom', 'Run in Hole']
+    channels = ['bit_depth', 'block_height', 'hole_depth', 'hook_load', 'rotary_rpm',
+                'rotary_torque', 'tvd', 'pump_spm_total', 'standpipe_pressure', 'mud_flow_in',
+                'rop', 'weight_on_bit', 'mwd_annulus_ecd', 'mud_flow_out_percent', 'mud_density']
+    values = rng.random((n, len(channels))) * 1000
+    state_idx = rng.integers(0, len(states), n)
+    return [{'timestamp': start + i,
+             'data': {**dict(zip(channels, values[i].tolist())), 'state': states[state_idx[i]]}}
+            for i in range(n)]
+
+def _legacy_resample(df, rule=RESAMPLE_RULE):
+    df = df.set_index('time_stamp')
+    df = df.resample(rule).agg(
+        {col: 'mean' if pd.api.types.is_numeric_dtype(df[col]) else lambda x: x.value_counts().index[0] for col in df.columns})
+    return df.reset_index()
+
+def _timed(func, *args):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start_time
+
+if __name__ == '__main__':
+    import os
+
+    # Normalisation - one 24 hour, 1 Hz pull
+    js = _synthetic_records()
+    for label, func in (('legacy apply/from_records', _legacy_records_to_frame),
+                        ('normalize_wits_records', normalize_wits_records)):
+        df, execution_time = _timed(func, js)
+        print(f'{label:>28}: {execution_time:.3f}s, {df.memory_usage(deep=True).sum() / 1e6:.1f} MB')
+
+    # Counters past 2**24 keep whole-stroke diffs (float32 would round every other one away)
+    counter = normalize_wits_records([{'timestamp': i, 'data': {'strks_total': 2**24 + i, 'hook_load': 1.5}}
+                                      for i in range(10)])
+    assert (counter['strks_total'].diff().dropna() == 1).all() and counter['hook_load'].dtype == 'float32'
+
+    # Resampling - d142 sized sample and a 24 hour overview pull
+    df_day = add_asset_columns(normalize_wits_records(js), {'asset_id': 1, 'well_name': '1C-157', 'rig_name': 'Doyon 142'})
+    df_d142 = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'test', 'd142.csv'), index_col=0)
+    df_d142['time_stamp'] = pd.to_datetime(df_d142['time_stamp'])
+    df_d142['state'] = np.where(df_d142['hole_depth'] - df_d142['bit_depth'] < 1, 'Rotary Drilling', 'In Slips')
+
+    for name, df, rule in (('d142.csv', df_d142, '30S'), ('24h 1 Hz', df_day, RESAMPLE_RULE)):
+        legacy, legacy_time = _timed(_legacy_resample, df, rule)
+        fast, fast_time = _timed(resample_wits, df, rule)
+        print(f'{name:>10} resample {rule}: legacy {legacy_time:.3f}s, resample_wits {fast_time:.4f}s '
+              f'({len(df)} -> {len(fast)} rows)')
@@ -0,0 +1,182 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from utils.cache import ProcessLock
+from utils.wits import concat_wits_pages
+
+# Globals -----------------------------------------------------------
+CACHE_DIR = os.getenv('WITS_CACHE_DIR', os.path.join('data', 'wits_cache'))
+RETENTION_DAYS = int(os.getenv('WITS_CACHE_RETENTION_DAYS', 7))
+
+# --- Local wits cache ----------------------------------------------
+class WitsCache:
+    """
+        On-disk Parquet cache of one wits collection per asset, partitioned by day:
+            <root>/<collection>/<asset_id>/day=YYYY-MM-DD/part-<first_ts>.parquet
+        Each request only downloads records newer than the last sync (plus any
+        older history a longer look-back needs), so changing the look-back
+        window is a local read. Syncs of one asset are serialised by a lock
+        on disk, which also holds for background callback job processes.
+    """
+    def __init__(self, client, telem_fields, collection='wits', step=1, root=CACHE_DIR,
+                 retention_days=RETENTION_DAYS):
+        self.client = client
+        self.telem_fields = telem_fields
+        self.collection = collection
+        self.step = step                # seconds per record in the collection
+        self.root = os.path.join(root, collection)
+        self.retention_days = retention_days
+
+    # --- Paths & sync state ----------------------------------------
+    def _asset_dir(self, asset_id):
+        return os.path.join(self.root, str(asset_id))
+
+    def _state_path(self, asset_id):
+        return os.path.join(self._asset_dir(asset_id), '_sync.json')
+
+    def _lock(self, asset_id):
+        return ProcessLock(f'wits_cache:{self.collection}:{asset_id}')
+
+    def _read_state(self, asset_id):
+        try:
+            with open(self._state_path(asset_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_state(self, asset_id, state):
+        path = self._state_path(asset_id)
+        # Own temp file per writer, then an atomic swap
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), suffix='.tmp', delete=False) as f:
+            json.dump(state, f)
+        os.replace(f.name, path)
+
+    # --- Writes ----------------------------------------------------
+    def _write_pages(self, asset_id, pages):
+        """Append pages as day-partitioned part files; returns (min_ts, max_ts) written."""
+        df = concat_wits_pages(pages)
+        if df.empty:
+            return None, None
+
+        days = pd.to_datetime(df['timestamp'], unit='s', utc=True).dt.strftime('%Y-%m-%d')
+        for day, df_day in df.groupby(days, sort=False):
+            day_dir = os.path.join(self._asset_dir(asset_id), f'day={day}')
+            os.makedirs(day_dir, exist_ok=True)
+            part = os.path.join(day_dir, f'part-{int(df_day["timestamp"].min())}-{time.time_ns()}.parquet')
+            df_day.reset_index(drop=True).to_parquet(part, index=False)
+
+        return int(df['timestamp'].min()), int(df['timestamp'].max())
+
+    def _prune(self, asset_id, newest_ts):
+        cutoff = pd.Timestamp(newest_ts, unit='s', tz='UTC') - pd.Timedelta(days=self.retention_days)
+        asset_dir = self._asset_dir(asset_id)
+        for name in os.listdir(asset_dir):
+            if name.startswith('day=') and name[4:] < cutoff.strftime('%Y-%m-%d'):
+                shutil.rmtree(os.path.join(asset_dir, name), ignore_errors=True)
+
+    # --- Sync ------------------------------------------------------
+    def _behind_window(self, asset_id, state, window):
+        """True when Corva's newest record is more than `window` seconds past the last sync."""
+        if time.time() - state['last_ts'] <= window:
+            return False
+        newest = concat_wits_pages(self.client.iter_wits_pages(asset_id, self.telem_fields, max_rows=1,
+                                                               collection=self.collection))
+        return not newest.empty and newest['timestamp'].max() - state['last_ts'] > window
+
+    def sync(self, asset_id, hrs):
+        """
+            Bring the cache up to date for the latest `hrs` hours of the asset.
+            Output: sync state {first_ts, last_ts}, or None when Corva has no data
+        """
+        window = int(hrs * 3600)
+
+        with self._lock(asset_id):
+            os.makedirs(self._asset_dir(asset_id), exist_ok=True)
+            state = self._read_state(asset_id)
+
+            # Hours or days stale - catching up would page through every record since
+            # the last sync to serve one window. Start over; the old span is dropped
+            # from the state, so the gap is never read as cached.
+            if state is not None and self._behind_window(asset_id, state, window):
+                state = None
+
+            if state is None:
+                # Cold start - same rows the uncached getter would return
+                pages = self.client.iter_wits_pages(asset_id, self.telem_fields, max_rows=window // self.step,
+                                                    collection=self.collection)
+                first_ts, last_ts = self._write_pages(asset_id, pages)
+                if last_ts is None:
+                    return None
+                state = {'first_ts': min(first_ts, last_ts - window + 1), 'last_ts': last_ts}
+            else:
+                # Tail - only records newer than the last sync
+                pages = self.client.iter_wits_pages(asset_id, self.telem_fields,
+                                                    start_ts=state['last_ts'] + 1, descending=False,
+                                                    collection=self.collection)
+                _, last_ts = self._write_pages(asset_id, pages)
+                if last_ts is not None:
+                    state['last_ts'] = last_ts
+
+                # Head - older history when the look-back grew past what is cached
+                window_start = state['last_ts'] - window + 1     # the span get_window reads
+                if window_start < state['first_ts']:
+                    pages = self.client.iter_wits_pages(asset_id, self.telem_fields,
+                                                        start_ts=window_start,
+                                                        end_ts=state['first_ts'] - 1,
+                                                        collection=self.collection)
+                    self._write_pages(asset_id, pages)
+                    state['first_ts'] = window_start
+
+            self._write_state(asset_id, state)
+            self._prune(asset_id, state['last_ts'])
+
+        return state
+
+    # --- Reads -----------------------------------------------------
+    def read(self, asset_id, start_ts, end_ts) -> pd.DataFrame:
+        """Read cached rows with start_ts <= timestamp <= end_ts, newest first."""
+        asset_dir = self._asset_dir(asset_id)
+        first_day = pd.Timestamp(start_ts, unit='s', tz='UTC').strftime('%Y-%m-%d')
+        last_day = pd.Timestamp(end_ts, unit='s', tz='UTC').strftime('%Y-%m-%d')
+        filters = [('timestamp', '>=', start_ts), ('timestamp', '<=', end_ts)]
+
+        pages = []
+        for name in sorted(os.listdir(asset_dir)) if os.path.isdir(asset_dir) else []:
+            if not name.startswith('day=') or not first_day <= name[4:] <= last_day:
+                continue
+            day_dir = os.path.join(asset_dir, name)
+            for part in os.listdir(day_dir):
+                pages.append(pd.read_parquet(os.path.join(day_dir, part), filters=filters))
+
+        df = concat_wits_pages(pages)
+        if df.empty:
+            return df
+
+        # Concurrent syncs from several workers can write the same records twice -
+        # timestamps are not unique, so only identical rows are dropped
+        df = df.drop_duplicates(ignore_index=True)
+        return df.sort_values('timestamp', ascending=False, ignore_index=True)
+
+    def get_window(self, asset_id, hrs) -> pd.DataFrame:
+        """Latest `hrs` hours of the collection for the asset, syncing only the new tail."""
+        state = self.sync(asset_id, hrs)
+        if state is None:
+            return pd.DataFrame()
+        return self.read(asset_id, state['last_ts'] - int(hrs * 3600) + 1, state['last_ts'])
+
+    def read_range(self, asset_id, start_ts, end_ts) -> pd.DataFrame:
+        """
+            Rows with start_ts <= timestamp <= end_ts - a local read when the
+            synced span covers them, otherwise fetched straight from Corva
+            (not written back, so the cached span stays contiguous).
+        """
+        state = self._read_state(asset_id)
+        if state is not None and state['first_ts'] <= start_ts and end_ts <= state['last_ts']:
+            return self.read(asset_id, start_ts, end_ts)
+
+        pages = self.client.iter_wits_pages(asset_id, self.telem_fields, start_ts=int(start_ts),
+                                            end_ts=int(end_ts), collection=self.collection)
+        return concat_wits_pages(pages)
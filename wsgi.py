@@ -0,0 +1,12 @@
+import os
+from app import app, server
+
+# --- Production entry point ----------------------------------------
+#   gunicorn wsgi:server --workers 4 --threads 4 --bind 0.0.0.0:8050 --timeout 180
+# Workers share Corva asset headers and selection summaries through
+# utils.cache (filesystem by default, Redis with CACHE_TYPE=RedisCache)
+# and wits data through the Parquet caches under data/.
+
+if __name__ == '__main__':
+    # Fallback for hosts without gunicorn (e.g. Windows) - one process, no reloader
+    app.run_server(debug=False, host='0.0.0.0', port=int(os.getenv('PORT', 8050)))